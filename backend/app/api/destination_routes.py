@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Query
+from app.services.destination_index import destination_index
+
+# Served from the bundled gazetteer only, so no auth round-trip on every keystroke
+router = APIRouter()
+
+@router.get("/suggest")
+async def suggest_destinations(q: str = Query("", max_length=100), limit: int = Query(8, ge=1, le=20)):
+    """
+    Autocomplete suggestions for the Planner destination field.
+    """
+    return {"suggestions": destination_index.suggest(q, limit)}
+
+@router.get("/resolve")
+async def resolve_destination(q: str = Query(..., max_length=200)):
+    """
+    Maps free text (e.g. 'KYOTO ', 'Kyōto', 'Kyoto, Japan') to its canonical place.
+    """
+    return {"query": q, "place": destination_index.resolve(q)}
@@ -0,0 +1,49 @@
+import os
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from app.auth.auth_utils import get_current_user, User
+from app.services.rate_limiter import rate_limiter
+
+def client_ip(request: Request) -> str:
+    # Vercel's proxy sets X-Forwarded-For; elsewhere it is client controlled
+    if os.getenv("VERCEL_ENV"):
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def _too_many(retry_after: int) -> dict:
+    return {"Retry-After": str(max(1, retry_after))}
+
+class IPRateLimitMiddleware:
+    """
+    Coarse per-IP limit on /api, applied before the Supabase auth round-trip.
+    Plain ASGI rather than BaseHTTPMiddleware so accepted requests pay only for the check.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/api/") and scope["path"] != "/api/":
+            allowed, retry_after = rate_limiter.check("ip", client_ip(Request(scope)))
+            if not allowed:
+                response = JSONResponse(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    content={"detail": "Too many requests from this address"},
+                    headers=_too_many(retry_after),
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+def rate_limit(scope: str):
+    """Dependency enforcing the per-user limit configured for scope."""
+    async def dependency(current_user: User = Depends(get_current_user)):
+        allowed, retry_after = rate_limiter.check(scope, current_user.email)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded for {scope}",
+                headers=_too_many(retry_after),
+            )
+    return dependency
@@ -1,24 +1,72 @@
+import json
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional
 from app.services.youtube_service import youtube_service
 from app.auth.auth_utils import get_current_user
+from app.api.limits import rate_limit
 
 router = APIRouter(dependencies=[Depends(get_current_user)])
 
 class VideoSearchRequest(BaseModel):
     query: str
+    max_results: int = Field(6, ge=1, le=50)
+    page_token: Optional[str] = None
+    min_duration: Optional[int] = None  # seconds
+    max_duration: Optional[int] = None  # seconds
+    sort: Optional[str] = None  # "views" or "likes"
 
-@router.post("/videos")
+class VideoStreamRequest(VideoSearchRequest):
+    max_pages: int = Field(3, ge=1, le=10)
+
+SORT_FIELDS = {"views": "view_count", "likes": "like_count"}
+
+def _filter_videos(videos: list, request: VideoSearchRequest) -> list:
+    if request.min_duration is not None:
+        videos = [v for v in videos if v.get("duration_seconds", 0) >= request.min_duration]
+    if request.max_duration is not None:
+        videos = [v for v in videos if v.get("duration_seconds", 0) <= request.max_duration]
+    sort_key = SORT_FIELDS.get(request.sort)
+    if sort_key:
+        videos = sorted(videos, key=lambda v: v.get(sort_key, 0), reverse=True)
+    return videos
+
+@router.post("/videos", dependencies=[Depends(rate_limit("videos"))])
 async def search_videos(request: VideoSearchRequest):
     """
     Search for YouTube videos based on a query (e.g., 'Kyoto 4k walking tour').
+    Results include duration and view/like counts; pass next_page_token back as page_token for more.
     """
-    results = youtube_service.search_videos(request.query)
-    
-    if isinstance(results, dict) and "error" in results:
+    page = await run_in_threadpool(
+        youtube_service.search_page, request.query, request.max_results, request.page_token
+    )
+
+    if "error" in page:
         # Fallback logic or error reporting
         # For now, return empty or the error, but frontend handles empty gracefully
-        print(f"YouTube Search Error: {results['error']}")
-        return {"videos": []} # Return empty list on error to prevent frontend crash
-        
-    return {"videos": results}
+        print(f"YouTube Search Error: {page['error']}")
+        return {"videos": [], "next_page_token": None} # Return empty list on error to prevent frontend crash
+
+    return {"videos": _filter_videos(page["videos"], request), "next_page_token": page["next_page_token"]}
+
+@router.post("/videos/stream", dependencies=[Depends(rate_limit("videos"))])
+async def stream_videos(request: VideoStreamRequest):
+    """
+    Streams up to max_pages result pages as newline-delimited JSON, one page per line.
+    """
+    pages = youtube_service.stream_pages(
+        request.query, request.max_results, request.page_token, request.max_pages
+    )
+
+    async def ndjson():
+        async for page in iterate_in_threadpool(pages):
+            if "error" in page:
+                print(f"YouTube Search Error: {page['error']}")
+                yield json.dumps({"videos": [], "next_page_token": None}) + "\n"
+                return
+            yield json.dumps({"videos": _filter_videos(page["videos"], request),
+                              "next_page_token": page["next_page_token"]}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from app.services.profiler import profiler, PROFILE_HEADER
+
+router = APIRouter()
+
+class ProfilingMiddleware:
+    """
+    Records a stage breakdown for requests carrying the admin profile token, and for a
+    sampled fraction of the rest. Only installed when profiling is configured.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/") or scope["path"].startswith("/api/profiles"):
+            await self.app(scope, receive, send)
+            return
+        header = PROFILE_HEADER.encode()
+        token = next((v.decode() for k, v in scope["headers"] if k == header), None)
+        sampled = profiler.should_profile(token)
+        if sampled is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile, context = profiler.start(scope["method"], scope["path"], sampled)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Stages are complete once the endpoint has returned; expose them to browser devtools
+                timing = ", ".join(f"{name};dur={ms}" for name, ms in profile.stages().items() if name != "other")
+                if timing:
+                    message = {**message, "headers": list(message.get("headers", [])) + [(b"server-timing", timing.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            profiler.finish(profile, context, status_code)
+
+def _require_admin(token: Optional[str]):
+    if not profiler.authorized(token):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+@router.get("")
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=1000),
+    path: Optional[str] = None,
+    x_profile_token: Optional[str] = Header(None),
+):
+    """
+    Most recent request profiles with per-stage timings in milliseconds.
+    """
+    _require_admin(x_profile_token)
+    return {"profiles": [p.to_dict() for p in profiler.recent(limit, path)]}
+
+@router.get("/folded", response_class=PlainTextResponse)
+async def folded_profiles(
+    limit: Optional[int] = Query(None, ge=1),
+    path: Optional[str] = None,
+    x_profile_token: Optional[str] = Header(None),
+):
+    """
+    Buffered profiles as collapsed stacks for flamegraph.pl / speedscope.
+    """
+    _require_admin(x_profile_token)
+    return profiler.folded(profiler.recent(limit, path))
@@ -8,7 +8,7 @@ from .auth_utils import (
     Token,
     User
 )
-from app.supabase_client import get_supabase_client
+from app.supabase_client import get_async_auth_client, login_gate, AuthUnavailable
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
@@ -21,6 +21,13 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+def _auth_unavailable(e: AuthUnavailable) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=Token)
 async def register(user_data: UserRegister):
     """
@@ -28,19 +35,21 @@ async def register(user_data: UserRegister):
     This endpoint remains for backward compatibility or direct API usage.
     """
     try:
-        supabase = get_supabase_client()
-        auth_response = supabase.auth.sign_up({
+        auth = get_async_auth_client()
+        auth_response = await login_gate.run(auth.sign_up({
             "email": user_data.email,
             "password": user_data.password,
             "options": {
                 "data": {"full_name": user_data.full_name}
             }
-        })
+        }))
         
         if not auth_response.session:
              return {"access_token": "email-confirmation-required", "token_type": "bearer"}
              
         return {"access_token": auth_response.session.access_token, "token_type": "bearer"}
+    except AuthUnavailable as e:
+        raise _auth_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -50,12 +59,14 @@ async def login(user_data: UserLogin):
     Note: Login is now handled directly by the frontend via Supabase.
     """
     try:
-        supabase = get_supabase_client()
-        auth_response = supabase.auth.sign_in_with_password({
+        auth = get_async_auth_client()
+        auth_response = await login_gate.run(auth.sign_in_with_password({
             "email": user_data.email, 
             "password": user_data.password
-        })
+        }))
         return {"access_token": auth_response.session.access_token, "token_type": "bearer"}
+    except AuthUnavailable as e:
+        raise _auth_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=401, detail=str(e))
 
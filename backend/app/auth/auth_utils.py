@@ -7,7 +7,8 @@ import os
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.supabase_client import get_supabase_client
+from app.supabase_client import get_async_auth_client, verify_gate, AuthUnavailable
+from app.services.profiler import profiler
 
 load_dotenv()
 
@@ -37,9 +38,9 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     """
     token = credentials.credentials
     try:
-        supabase = get_supabase_client()
-        # Verify token with Supabase
-        user_response = supabase.auth.get_user(token)
+        # Verify token with Supabase without blocking the event loop
+        with profiler.span("auth"):
+            user_response = await verify_gate.run(get_async_auth_client().get_user(token))
         
         if not user_response.user:
             raise HTTPException(
@@ -54,6 +55,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             full_name=user_metadata.get("full_name", "User"),
             disabled=False
         )
+    except HTTPException:
+        raise
+    except AuthUnavailable as e:
+        print(f"Auth unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         print(f"Auth error: {str(e)}")
         raise HTTPException(
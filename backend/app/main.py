@@ -1,13 +1,25 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import router as api_router
 from app.database import init_db
+from app.api.limits import IPRateLimitMiddleware
+from app.api.profile_routes import ProfilingMiddleware
+from app.services.profiler import profiler
+
+# Each worker loads local data and opens its upstream connection pools before serving
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.services.warmup import warm_up
+    await warm_up()
+    yield
 
 app = FastAPI(
     title="TravelMind AI API",
     description="Backend for the TravelMind intelligent travel platform.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -17,6 +29,13 @@ app = FastAPI(
 #     init_db()
 #     print("✅ Database initialized successfully")
 
+# Per-IP rate limit. Registered before CORS so CORS stays outermost and 429s carry CORS headers.
+app.add_middleware(IPRateLimitMiddleware)
+
+# Opt-in request profiling (PROFILE_TOKEN / PROFILE_SAMPLE_RATE). Not installed otherwise.
+if profiler.enabled:
+    app.add_middleware(ProfilingMiddleware)
+
 # CORS Configuration
 origins = [
     "http://localhost:5173",
@@ -40,9 +59,13 @@ async def health_check():
 
 from app.api.ai_routes import router as ai_router
 from app.api.media_routes import router as media_router
+from app.api.destination_routes import router as destination_router
+from app.api.profile_routes import router as profile_router
 from app.auth.auth_routes import router as auth_router
 
 app.include_router(ai_router, prefix="/api/ai", tags=["ai"])
 app.include_router(media_router, prefix="/api/media", tags=["media"])
+app.include_router(destination_router, prefix="/api/destinations", tags=["destinations"])
+app.include_router(profile_router, prefix="/api/profiles", tags=["profiles"])
 app.include_router(auth_router)
 
@@ -1,11 +1,28 @@
+import asyncio
+import hashlib
+import json
 import os
+from collections import OrderedDict
 from groq import AsyncGroq
 from dotenv import load_dotenv
+from app.services.prompt_registry import JSON_SYSTEM, count_tokens, token_ledger
+from app.services.profiler import profiler
+from app.services.shared_cache import response_cache
 
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
+# Upstream concurrency. Once AI_MAX_QUEUED calls are waiting for a slot the service
+# sheds load: it serves the last good answer for the same prompt, or a degraded one.
+AI_MAX_INFLIGHT = int(os.getenv("AI_MAX_INFLIGHT", "8"))
+AI_MAX_QUEUED = int(os.getenv("AI_MAX_QUEUED", "32"))
+RECENT_RESPONSES = 256
+# Identical prompts within this window are answered from the cache shared by all workers
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "3600"))
+
+BUSY_MESSAGE = "TravelMind is handling a lot of requests right now. Please try again in a moment."
+
 class AIService:
     def __init__(self):
         if not GROQ_API_KEY or GROQ_API_KEY == "your_groq_api_key_here":
@@ -14,38 +31,144 @@ class AIService:
         else:
             self.client = AsyncGroq(api_key=GROQ_API_KEY)
             self.model = "llama-3.3-70b-versatile"
+        self._slots = asyncio.Semaphore(AI_MAX_INFLIGHT)
+        self._waiting = 0
+        self._recent = OrderedDict()
+
+    @property
+    def overloaded(self) -> bool:
+        return self._waiting >= AI_MAX_QUEUED
+
+    @staticmethod
+    def _messages(prompt: str, system: str = None) -> list:
+        # The system message goes first and never changes per template, so
+        # repeated calls share a cacheable prefix.
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    @staticmethod
+    def _limits(max_tokens: int = None) -> dict:
+        return {"max_tokens": max_tokens} if max_tokens else {}
 
-    async def generate_content(self, prompt: str) -> str:
+    @staticmethod
+    def _cache_key(messages: list, json_mode: bool) -> str:
+        digest = hashlib.sha256(str(json_mode).encode())
+        for m in messages:
+            digest.update(m["role"].encode() + b"\0" + m["content"].encode() + b"\0")
+        return digest.hexdigest()
+
+    @staticmethod
+    def _record_usage(route: str, category: str, messages: list, completion: str):
+        if route:
+            with profiler.span("token_count"):
+                prompt_tokens = sum(count_tokens(m["content"]) for m in messages)
+                token_ledger.record(route, category, prompt_tokens, count_tokens(completion))
+
+    def _shed(self, key: str, degraded: str) -> str:
+        cached = self._recent.get(key)
+        print(f"AI upstream saturated ({self._waiting} queued): serving {'cached' if cached else 'degraded'} response")
+        return cached if cached is not None else degraded
+
+    async def _call(self, messages: list, route: str, category: str, **kwargs) -> str:
+        self._waiting += 1
+        try:
+            with profiler.span("upstream_queue"):
+                await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            with profiler.span("upstream"):
+                chat_completion = await self.client.chat.completions.create(
+                    messages=messages,
+                    model=self.model,
+                    **kwargs,
+                )
+        finally:
+            self._slots.release()
+        content = chat_completion.choices[0].message.content
+        self._record_usage(route, category, messages, content)
+        return content
+
+    @staticmethod
+    def _text_check(cacheable=None):
+        """Validity check for a text completion: non-empty and accepted by cacheable(text)."""
+        return lambda text: bool(text and text.strip()) and (cacheable is None or cacheable(text))
+
+    @staticmethod
+    def _json_check(cacheable=None):
+        """Validity check for a JSON completion: a non-empty object accepted by cacheable(data)."""
+        def check(text):
+            try:
+                data = json.loads(text)
+            except (TypeError, ValueError):
+                return False
+            return isinstance(data, dict) and bool(data) and (cacheable is None or bool(cacheable(data)))
+        return check
+
+    async def _complete(self, key: str, messages: list, valid, route: str = None, category: str = None, **kwargs) -> str:
+        # Concurrent identical prompts, in this worker or another, share one upstream call.
+        # Only completions that pass valid() are cached or kept as a fallback under load.
+        content = await response_cache.get_or_compute(
+            "llm", key, LLM_CACHE_TTL, lambda: self._call(messages, route, category, **kwargs), cacheable=valid
+        )
+        if valid(content):
+            self._recent[key] = content
+            self._recent.move_to_end(key)
+            if len(self._recent) > RECENT_RESPONSES:
+                self._recent.popitem(last=False)
+        return content
+
+    async def generate_content(self, prompt: str, system: str = None, max_tokens: int = None,
+                               route: str = None, category: str = None, cacheable=None) -> str:
+        """
+        Plain-text completion. cacheable(text) decides whether the answer may be reused;
+        empty answers and errors never are.
+        """
         if not self.client:
             return "AI Service Unavailable: Please configure GROQ_API_KEY in backend/.env"
-        
+
+        messages = self._messages(prompt, system)
+        key = self._cache_key(messages, False)
+        # A miss is counted by _complete if it goes upstream
+        cached = response_cache.get("llm", key, count_miss=False)
+        if cached is not None:
+            return cached
+        if self.overloaded:
+            return self._shed(key, BUSY_MESSAGE)
         try:
-            chat_completion = await self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model=self.model,
-            )
-            return chat_completion.choices[0].message.content
+            return await self._complete(key, messages, self._text_check(cacheable), route, category,
+                                        **self._limits(max_tokens))
         except Exception as e:
             return f"AI Error: {str(e)}"
 
-    async def get_json_content(self, prompt: str) -> str:
-        """Forces the AI to return a JSON string using Groq's JSON mode."""
+    async def get_json_content(self, prompt: str, system: str = JSON_SYSTEM, max_tokens: int = None,
+                               route: str = None, category: str = None, cacheable=None) -> str:
+        """
+        Forces the AI to return a JSON string using Groq's JSON mode. Only a non-empty
+        object accepted by cacheable(parsed) is reused for identical prompts.
+        """
         if not self.client:
             return "{}"
-        
+
+        messages = self._messages(prompt, system)
+        key = self._cache_key(messages, True)
+        cached = response_cache.get("llm", key, count_miss=False)
+        if cached is not None:
+            return cached
+        if self.overloaded:
+            # Callers already fall back to a safe structure on an empty object
+            return self._shed(key, "{}")
         try:
-            chat_completion = await self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that outputs only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model,
-                response_format={"type": "json_object"}
+            return await self._complete(
+                key, messages, self._json_check(cacheable), route, category,
+                response_format={"type": "json_object"}, **self._limits(max_tokens)
             )
-            return chat_completion.choices[0].message.content
         except Exception as e:
             print(f"Groq JSON Error: {e}")
             # Fallback to standard completion if JSON mode fails
-            return await self.generate_content(prompt + "\n\nReturn only valid JSON.")
+            return await self.generate_content(prompt + "\n\nReturn only valid JSON.", system=system,
+                                               max_tokens=max_tokens, route=route, category=category,
+                                               cacheable=self._json_check(cacheable))
 
 ai_service = AIService()
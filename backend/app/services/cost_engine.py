@@ -0,0 +1,183 @@
+import json
+import os
+import re
+from functools import lru_cache
+import numpy as np
+
+FX_RATES_PATH = os.getenv("FX_RATES_PATH", os.path.join(os.path.dirname(__file__), "..", "data", "fx_rates.json"))
+
+# The Planner stores budgets in rupees
+DEFAULT_CURRENCY = "INR"
+
+COST_TYPES = ("food", "transport", "hotel", "activity")
+# Keys match the budget insight's `suggested_split` so the Budget page can use either
+SPLIT_LABELS = {"hotel": "Accommodation", "food": "Food", "transport": "Transport", "activity": "Activities"}
+
+_SYMBOLS = {
+    "us$": "USD", "a$": "AUD", "au$": "AUD", "c$": "CAD", "ca$": "CAD", "s$": "SGD", "hk$": "HKD",
+    "nz$": "NZD", "r$": "BRL", "$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "円": "JPY", "₹": "INR",
+    "rs.": "INR", "rs": "INR", "₩": "KRW", "฿": "THB", "₺": "TRY", "₫": "VND", "₱": "PHP", "rp": "IDR",
+}
+_WORDS = {
+    "dollar": "USD", "dollars": "USD", "euro": "EUR", "euros": "EUR", "pound": "GBP", "pounds": "GBP",
+    "yen": "JPY", "rupee": "INR", "rupees": "INR", "won": "KRW", "baht": "THB", "dirham": "AED",
+    "dirhams": "AED", "lira": "TRY", "yuan": "CNY", "rmb": "CNY", "francs": "CHF", "rand": "ZAR",
+}
+_FREE_RE = re.compile(r"\b(free|included|complimentary|no cost|none)\b", re.IGNORECASE)
+_AMOUNT = r"(\d+(?:[.,]\d+)*)\s*([km])?"
+_RANGE_RE = re.compile(
+    _AMOUNT + r"(?:\s*(?:-|–|—|to)\s*(?:[^\d\s]{0,4}\s*)?" + _AMOUNT + r")?",
+    re.IGNORECASE,
+)
+_CURRENCY_RE = re.compile(
+    r"(us\$|a\$|au\$|c\$|ca\$|s\$|hk\$|nz\$|r\$|\$|€|£|¥|円|₹|rs\.?(?=\s*\d)|₩|฿|₺|₫|₱|rp(?=\s*\d))"
+    r"|\b((?-i:[A-Z]{3}))\b"
+    r"|\b(" + "|".join(sorted(_WORDS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+
+def _number(digits: str, suffix: str) -> float:
+    # Separators ending in a group of exactly three digits are grouping ("1,200", "1.200.000",
+    # "1,20,000"); otherwise the last separator is the decimal point ("12.50", "€12,50", "1.234,50")
+    if re.fullmatch(r"\d{1,3}([.,]\d{2,3})*[.,]\d{3}", digits):
+        value = float(re.sub(r"[.,]", "", digits))
+    else:
+        cut = max(digits.rfind("."), digits.rfind(","))
+        value = float(digits) if cut < 0 else float(re.sub(r"[.,]", "", digits[:cut]) + "." + digits[cut + 1:])
+    return value * {"k": 1e3, "m": 1e6}.get((suffix or "").lower(), 1)
+
+class RateTable:
+    def __init__(self, path: str = FX_RATES_PATH):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.base = data["base"]
+        self.as_of = data.get("as_of")
+        self.rates = {code: float(rate) for code, rate in data["rates"].items()}
+
+    def convert_factor(self, source: str, target: str) -> float:
+        return self.rates[target] / self.rates[source]
+
+def parse_cost(value):
+    """
+    Parses a cost estimate ("$20", "Free", "€15-25", "Free - $10", "2000 JPY", "₹1.2k", or a
+    bare number) into (low, high, currency). currency is None when the value names none;
+    returns None if no amount can be found.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return (float(value), float(value), None) if value >= 0 else None
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return _parse_cost_text(value)
+
+@lru_cache(maxsize=65536)
+def _parse_cost_text(text: str):
+    amounts = list(_RANGE_RE.finditer(text))
+    free = _FREE_RE.search(text)
+    if not amounts:
+        # "Free", "Included in ticket": no amount but a known price
+        return (0.0, 0.0, None) if free else None
+
+    currency, marker = None, None
+    for match in _CURRENCY_RE.finditer(text):
+        symbol, code, word = match.groups()
+        if symbol:
+            currency = _SYMBOLS[symbol.lower()]
+        elif code and code.upper() in cost_engine.rates.rates:
+            currency = code.upper()
+        elif word:
+            currency = _WORDS[word.lower()]
+        if currency:
+            marker = match
+            break
+
+    # "Day pass 24hr $15": the price is the amount next to the currency, not the first number
+    amount = amounts[0]
+    if marker is not None and len(amounts) > 1:
+        def gap(m):
+            return m.start() - marker.end() if m.start() >= marker.end() else marker.start() - m.end()
+        amount = min(amounts, key=gap)
+    low = _number(amount.group(1), amount.group(2))
+    high = _number(amount.group(3), amount.group(4) or amount.group(2)) if amount.group(3) else low
+    if free and free.start() < amount.start() and not amount.group(3):
+        # "Free - $10", "Free or $5 donation": the free option is the low end
+        low = 0.0
+    return min(low, high), max(low, high), currency
+
+class CostEngine:
+    def __init__(self, rates: RateTable = None):
+        self._rates = rates
+
+    @property
+    def rates(self) -> RateTable:
+        if self._rates is None:
+            self._rates = RateTable()
+        return self._rates
+
+    def currency_of(self, text: str, default: str = DEFAULT_CURRENCY) -> str:
+        parsed = parse_cost(text)
+        return parsed[2] if parsed and parsed[2] else default
+
+    def breakdown(self, itinerary: dict, currency: str = DEFAULT_CURRENCY) -> dict:
+        """
+        Per-day, per-type and trip totals for every activity cost_estimate, converted to currency.
+        Strings are parsed once each; the aggregation is a single NumPy pass.
+        """
+        currency = currency if currency in self.rates.rates else DEFAULT_CURRENCY
+        days = [d for d in itinerary.get("days", []) if isinstance(d, dict)]
+
+        lows, highs, factors, day_index, type_index = [], [], [], [], []
+        priced_items = []
+        unparsed = 0
+        for d, day in enumerate(days):
+            for activity in day.get("activities") or []:
+                if not isinstance(activity, dict):
+                    continue
+                parsed = parse_cost(activity.get("cost_estimate"))
+                if parsed is None:
+                    unparsed += 1
+                    continue
+                low, high, source = parsed
+                lows.append(low)
+                highs.append(high)
+                factors.append(self.rates.convert_factor(source or currency, currency))
+                day_index.append(d)
+                kind = activity.get("type")
+                type_index.append(COST_TYPES.index(kind) if kind in COST_TYPES else COST_TYPES.index("activity"))
+                priced_items.append(activity.get("title") or activity.get("location") or "Item")
+
+        factors = np.asarray(factors, dtype=float)
+        low = np.asarray(lows, dtype=float) * factors
+        high = np.asarray(highs, dtype=float) * factors
+        day_index = np.asarray(day_index, dtype=np.intp)
+        type_index = np.asarray(type_index, dtype=np.intp)
+
+        by_day_low = np.bincount(day_index, weights=low, minlength=len(days))
+        by_day_high = np.bincount(day_index, weights=high, minlength=len(days))
+        by_type_low = np.bincount(type_index, weights=low, minlength=len(COST_TYPES))
+        by_type_high = np.bincount(type_index, weights=high, minlength=len(COST_TYPES))
+        by_type_mid = (by_type_low + by_type_high) / 2
+        total_mid = by_type_mid.sum()
+
+        def span(lo, hi):
+            return {"low": round(float(lo), 2), "high": round(float(hi), 2), "mid": round(float(lo + hi) / 2, 2)}
+
+        mid = (low + high) / 2
+        top = np.argsort(-mid, kind="stable")[:5]
+        return {
+            "currency": currency,
+            "rates_as_of": self.rates.as_of,
+            "total": span(low.sum(), high.sum()),
+            "by_day": [{"day": days[d].get("day", d + 1), **span(by_day_low[d], by_day_high[d])} for d in range(len(days))],
+            "by_type": {kind: span(by_type_low[t], by_type_high[t]) for t, kind in enumerate(COST_TYPES)},
+            "split": {
+                SPLIT_LABELS[kind]: round(float(100 * by_type_mid[t] / total_mid), 1) if total_mid else 0.0
+                for t, kind in enumerate(COST_TYPES)
+            },
+            "typical_expenses": [{"item": priced_items[i], "price": round(float(mid[i]), 2)} for i in top if mid[i] > 0],
+            "parsed": len(lows),
+            "unparsed": unparsed,
+        }
+
+cost_engine = CostEngine()
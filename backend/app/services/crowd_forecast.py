@@ -0,0 +1,526 @@
+import asyncio
+import contextvars
+import csv
+import json
+import os
+import re
+import sys
+from collections import OrderedDict
+from datetime import date as Date
+from types import SimpleNamespace
+import numpy as np
+from app.services.gazetteer import gazetteer, fold
+from app.services.destination_index import destination_index
+from app.services.ai_service import ai_service, BUSY_MESSAGE
+from app.services import prompt_registry as prompts
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+CROWD_PROFILES_PATH = os.getenv("CROWD_PROFILES_PATH", os.path.join(DATA_DIR, "crowd_profiles.npz"))
+CROWD_EVENTS_PATH = os.getenv("CROWD_EVENTS_PATH", os.path.join(DATA_DIR, "crowd_events.json"))
+
+SOURCES = ("prior", "llm", "dataset")
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+HOURS = np.arange(24)
+# The hours the Crowd page charts (8AM to 8PM)
+FORECAST_HOURS = np.arange(8, 21, 2)
+ADVICE_CACHE = 1024
+# Background advice calls allowed at once; they never take upstream capacity from user requests
+ADVICE_INFLIGHT = 2
+# Places outside the gazetteer that seeding and imports may add to the store
+CROWD_MAX_ADDED_PLACES = int(os.getenv("CROWD_MAX_ADDED_PLACES", "5000"))
+
+# Relative traffic by weekday, Monday first
+WEEKDAY_FACTORS = np.array([0.85, 0.8, 0.85, 0.9, 1.0, 1.2, 1.15])
+# Monthly seasonality in percent, January first
+NORTHERN_SEASON = np.array([70, 70, 80, 90, 100, 110, 120, 120, 100, 90, 80, 95])
+TROPICAL_SEASON = np.array([110, 100, 95, 90, 85, 85, 90, 90, 85, 90, 100, 115])
+
+_TIME_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)?", re.IGNORECASE)
+
+def _bump(center: float, width: float) -> np.ndarray:
+    return np.exp(-0.5 * ((HOURS - center) / width) ** 2)
+
+def _prior_day(kind: str) -> np.ndarray:
+    if kind == "poi":
+        return 5 + 85 * _bump(13, 2.8)
+    # Cities have a second, evening peak for dining and nightlife
+    return 10 + 55 * _bump(13, 3.5) + 35 * _bump(19.5, 2.2)
+
+def _week(day: np.ndarray) -> np.ndarray:
+    return np.clip(day[None, :] * WEEKDAY_FACTORS[:, None], 0, 100)
+
+def _prior_season(lat: float) -> np.ndarray:
+    if abs(lat) < 23.5:
+        return TROPICAL_SEASON
+    return NORTHERN_SEASON if lat >= 0 else np.roll(NORTHERN_SEASON, 6)
+
+def _hour_label(hour: int) -> str:
+    return f"{(hour - 1) % 12 + 1}{'AM' if hour < 12 else 'PM'}"
+
+def _parse_hour(text) -> float:
+    """Hour of day from "8AM", "2 PM" or "14:00", or None."""
+    match = _TIME_RE.search(str(text))
+    if not match:
+        return None
+    hour = int(match.group(1)) % 12 if match.group(3) else int(match.group(1))
+    if match.group(3) and match.group(3)[0].lower() == "p":
+        hour += 12
+    return hour + int(match.group(2) or 0) / 60 if hour < 24 else None
+
+def _status(density: float) -> str:
+    return "Low" if density < 40 else "Moderate" if density < 70 else "High"
+
+def _wait_minutes(density: float) -> int:
+    # Queues only form past ~30% occupancy and grow faster than linearly after that
+    return int(round(max(0.0, density - 30) ** 1.3 / 4))
+
+class CrowdStore:
+    """
+    Density profiles for every place: 0-100 per weekday and hour, plus a monthly seasonality
+    factor, kept in flat uint8 arrays (180 bytes per place). Rows start from priors and are
+    replaced by seeded or imported profiles, which are persisted to an .npz file.
+    Only seeding and imports add places; forecasts never do.
+    """
+    def __init__(self, path: str = CROWD_PROFILES_PATH, max_added: int = CROWD_MAX_ADDED_PLACES):
+        self.path = path
+        self.max_added = max_added
+        self.base_rows = 0
+        self.ids = []
+        # Display names for places added by seeding, by row
+        self.names = {}
+        self._rows = {}
+        self._pois = {}
+        self.hourly = np.zeros((0, 7, 24), dtype=np.uint8)
+        self.monthly = np.zeros((0, 12), dtype=np.uint8)
+        self.source = np.zeros(0, dtype=np.uint8)
+        self.city_row = np.zeros(0, dtype=np.intp)
+
+    def load(self):
+        places = gazetteer.places
+        self.ids = [p["id"] for p in places]
+        self.base_rows = len(places)
+        self._rows = {place_id: row for row, place_id in enumerate(self.ids)}
+        self.hourly = np.stack([_week(_prior_day(p["kind"])) for p in places]).round().astype(np.uint8)
+        self.monthly = np.stack([_prior_season(p["lat"]) for p in places]).astype(np.uint8)
+        self.source = np.zeros(len(places), dtype=np.uint8)
+        self.city_row = np.array([self._rows.get(p.get("city"), row) for row, p in enumerate(places)], dtype=np.intp)
+        for row, p in enumerate(places):
+            if p["kind"] == "poi" and p.get("city") in self._rows:
+                self._pois.setdefault(self._rows[p["city"]], []).append(row)
+
+        if os.path.exists(self.path):
+            data = np.load(self.path)
+            rows = [self.row(str(i), city=str(c)) for i, c in zip(data["ids"], data["cities"])]
+            kept = np.array([k for k, row in enumerate(rows) if row is not None], dtype=np.intp)
+            rows = np.array([rows[k] for k in kept], dtype=np.intp)
+            self.hourly[rows] = data["hourly"][kept]
+            self.monthly[rows] = data["monthly"][kept]
+            self.source[rows] = data["source"][kept]
+            if "names" in data:
+                self.names.update((int(r), str(n)) for r, n in zip(rows, data["names"][kept]) if n)
+        return self
+
+    def save(self, path: str = None):
+        """Writes the non-prior rows; priors are rebuilt from code on load."""
+        rows = np.flatnonzero(self.source)
+        np.savez_compressed(
+            path or self.path,
+            ids=np.array([self.ids[r] for r in rows]),
+            cities=np.array([self.ids[self.city_row[r]] for r in rows]),
+            hourly=self.hourly[rows],
+            monthly=self.monthly[rows],
+            source=self.source[rows],
+            names=np.array([self.names.get(int(r), "") for r in rows]),
+        )
+
+    def row(self, key: str, city: str = None):
+        """
+        Row for a place id or folded name, adding a prior row for places outside the gazetteer.
+        Returns None once max_added places have been added.
+        """
+        row = self._rows.get(key)
+        if row is not None:
+            return row
+        if len(self.ids) - self.base_rows >= self.max_added:
+            return None
+        row = len(self.ids)
+        self.ids.append(key)
+        self._rows[key] = row
+        kind = "poi" if city and city != key else "city"
+        self.hourly = np.concatenate([self.hourly, _week(_prior_day(kind)).round().astype(np.uint8)[None]])
+        self.monthly = np.concatenate([self.monthly, NORTHERN_SEASON.astype(np.uint8)[None]])
+        self.source = np.append(self.source, np.uint8(0))
+        city_row = self._rows.get(city, row) if city else row
+        self.city_row = np.append(self.city_row, city_row)
+        if city_row != row:
+            self._pois.setdefault(city_row, []).append(row)
+        return row
+
+    def pois(self, city_row: int) -> list:
+        return self._pois.get(city_row, [])
+
+    def get(self, key: str):
+        return self._rows.get(key)
+
+def _usable_insight(data) -> bool:
+    """A model crowd report with a forecast and at least one spot."""
+    return (isinstance(data, dict) and isinstance(data.get("hourly_forecast"), list)
+            and isinstance(data.get("major_spots"), list) and bool(data["major_spots"]))
+
+def place_key(text: str):
+    """
+    (place id or folded text, city id) for a destination or attraction name. Only exact
+    matches count: a forecast for the wrong place is worse than asking the model.
+    """
+    match = destination_index.resolve(text)
+    if match is None or match["match"] != "exact":
+        key = fold(text)
+        return key, key
+    return match["id"], match["city"]
+
+class CrowdForecaster:
+    """
+    Crowd forecasts computed locally from the profile store: hourly profile x interpolated
+    seasonality x active events, vectorized over places and dates. The model is only asked
+    for the advice sentence, in the background; a templated tip is served until it lands.
+    """
+    def __init__(self, store: CrowdStore = None, events_path: str = CROWD_EVENTS_PATH):
+        self._store = store
+        self.events_path = events_path
+        self._events = None
+        self._advice = OrderedDict()
+        self._pending = set()
+        self._tasks = set()
+
+    @property
+    def store(self) -> CrowdStore:
+        if self._store is None:
+            self._store = CrowdStore().load()
+        return self._store
+
+    @property
+    def events(self):
+        if self._events is None:
+            with open(self.events_path, encoding="utf-8") as f:
+                entries = [e for e in json.load(f)["events"] if self.store.get(e["place"]) is not None]
+
+            def month_day(text):
+                month, day = text.split("-")
+                return int(month) * 100 + int(day)
+
+            self._events = SimpleNamespace(
+                names=[e["name"] for e in entries],
+                row=np.array([self.store.get(e["place"]) for e in entries], dtype=np.intp),
+                year=np.array([e.get("year", 0) for e in entries], dtype=np.int64),
+                start=np.array([month_day(e["start"]) for e in entries], dtype=np.int64),
+                end=np.array([month_day(e["end"]) for e in entries], dtype=np.int64),
+                log_factor=np.log(np.array([e["factor"] for e in entries], dtype=np.float64)),
+            )
+        return self._events
+
+    def _active_events(self, month_day: np.ndarray, years: np.ndarray) -> np.ndarray:
+        """(events, dates) mask; ranges with start > end wrap over the new year."""
+        ev = self.events
+        start, end = ev.start[:, None], ev.end[:, None]
+        inside = np.where(start <= end, (month_day >= start) & (month_day <= end), (month_day >= start) | (month_day <= end))
+        return inside & ((ev.year[:, None] == 0) | (ev.year[:, None] == years[None, :]))
+
+    def day_factors(self, rows, dates) -> np.ndarray:
+        """Seasonality x event multiplier with shape (places, dates)."""
+        rows = np.asarray(rows, dtype=np.intp)
+        return self._day_factors(self.store.monthly[rows], self.store.city_row[rows], dates)
+
+    def _day_factors(self, monthly: np.ndarray, city_rows: np.ndarray, dates) -> np.ndarray:
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        months = dates.astype("datetime64[M]")
+        month = months.astype(np.int64) % 12
+        years = months.astype("datetime64[Y]").astype(np.int64) + 1970
+        day_of_month = (dates - months.astype("datetime64[D]")).astype(np.int64)
+        month_length = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+
+        # Seasonality is interpolated between mid-month points so there is no step on the 1st
+        position = month + (day_of_month + 0.5) / month_length - 0.5
+        low = np.floor(position).astype(np.intp) % 12
+        weight = position - np.floor(position)
+        monthly = monthly.astype(np.float64)
+        season = (monthly[:, low] * (1 - weight) + monthly[:, (low + 1) % 12] * weight) / 100
+
+        active = self._active_events((month + 1) * 100 + day_of_month + 1, years)
+        applies = self.events.row[:, None] == np.asarray(city_rows)[None, :]
+        return season * np.exp(applies.T.astype(np.float64) @ (active * self.events.log_factor[:, None]))
+
+    def densities(self, rows, dates) -> np.ndarray:
+        """Density 0-100 with shape (places, dates, 24)."""
+        rows = np.asarray(rows, dtype=np.intp)
+        store = self.store
+        return self._densities(store.hourly[rows], store.monthly[rows], store.city_row[rows], dates)
+
+    def _densities(self, hourly: np.ndarray, monthly: np.ndarray, city_rows: np.ndarray, dates) -> np.ndarray:
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        weekday = (dates.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+        base = hourly[:, weekday].astype(np.float64)
+        return np.clip(base * self._day_factors(monthly, city_rows, dates)[:, :, None], 0, 100)
+
+    def knows(self, destination: str) -> bool:
+        """Whether the store has profiles for destination and at least one of its spots."""
+        key, city = place_key(destination)
+        city_row = self.store.get(city)
+        return city_row is not None and (key != city or bool(self.store.pois(city_row)))
+
+    def report(self, destination: str, day: Date = None, spots: int = 3) -> dict:
+        """The crowd insight for destination on day (default today), without the advice text."""
+        day = day or Date.today()
+        store = self.store
+        key, city = place_key(destination)
+        city_row = store.get(city)
+        focused = False
+        if city_row is None:
+            # Not in the store: forecast from a prior for this request only, without adding a row
+            rows = np.array([-1], dtype=np.intp)
+            density = self._densities(
+                _week(_prior_day("city")).round()[None], NORTHERN_SEASON[None], rows, [np.datetime64(day)]
+            )[:, 0, :]
+        else:
+            spot_rows = list(store.pois(city_row))
+            focus = store.get(key) if key != city else None
+            focused = focus is not None
+            if focused:
+                # A specific attraction was asked for; list it first
+                spot_rows = [focus] + [r for r in spot_rows if r != focus]
+            rows = np.array([city_row] + spot_rows, dtype=np.intp)
+            density = self.densities(rows, [np.datetime64(day)])[:, 0, :]
+
+        daytime = density[:, FORECAST_HOURS]
+        peaks = daytime.max(axis=1)
+        order = [1] if focused else []
+        order += [i for i in np.argsort(-peaks[1:], kind="stable") + 1 if i not in order]
+        major_spots = []
+        for i in order[:spots]:
+            row = rows[i]
+            place = gazetteer.get(store.ids[row])
+            major_spots.append({
+                "name": place["name"] if place else store.names.get(int(row), store.ids[row].title()),
+                "status": _status(peaks[i]),
+                "density": int(round(peaks[i])),
+                "wait_time": _wait_minutes(peaks[i]),
+                "best_time": _hour_label(int(FORECAST_HOURS[daytime[i].argmin()])),
+                "hourly_forecast": [{"time": _hour_label(int(h)), "density": int(round(d))} for h, d in zip(FORECAST_HOURS, daytime[i])],
+                "source": SOURCES[store.source[row]],
+            })
+
+        active = self._active_events(np.array([day.month * 100 + day.day]), np.array([day.year]))[:, 0]
+        active &= self.events.row == rows[0]
+        city_place = gazetteer.get(store.ids[city_row]) if city_row is not None else None
+        return {
+            "destination": city_place["name"] if city_place else destination,
+            "date": day.isoformat(),
+            "weekday": WEEKDAYS[day.weekday()],
+            "hourly_forecast": [{"time": _hour_label(int(h)), "density": int(round(d))} for h, d in zip(FORECAST_HOURS, daytime[0])],
+            "best_time": _hour_label(int(FORECAST_HOURS[daytime[0].argmin()])),
+            "peak_time": _hour_label(int(FORECAST_HOURS[daytime[0].argmax()])),
+            "major_spots": major_spots,
+            "events": [self.events.names[i] for i in np.flatnonzero(active)],
+            "source": SOURCES[store.source[city_row]] if city_row is not None else "prior",
+        }
+
+    # --- Advice ---
+
+    @staticmethod
+    def _template_advice(report: dict) -> str:
+        spots = report["major_spots"]
+        tip = f"{report['destination']} is busiest around {report['peak_time']}"
+        if spots:
+            tip += f"; visit {spots[0]['name']} around {spots[0]['best_time']} when it is quietest"
+        tip += "."
+        if report["events"]:
+            tip += f" Expect extra crowds for {', '.join(report['events'])}; book tickets ahead."
+        return tip
+
+    def advice(self, report: dict) -> tuple:
+        """(advice, "ai" | "forecast"). Never waits on the model."""
+        # One tip per destination, month, weekday/weekend and set of events
+        key = (report["destination"], report["date"][:7], report["weekday"] in WEEKDAYS[5:], tuple(report["events"]))
+        cached = self._advice.get(key)
+        if cached is not None:
+            self._advice.move_to_end(key)
+            return cached, "ai"
+        if (ai_service.client is not None and key not in self._pending
+                and len(self._pending) < ADVICE_INFLIGHT and not ai_service.overloaded):
+            self._pending.add(key)
+            # Started from an empty context so its spans don't land in this request's profile,
+            # which is finished by the time the advice arrives
+            task = contextvars.Context().run(asyncio.get_running_loop().create_task, self._write_advice(key, report))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return self._template_advice(report), "forecast"
+
+    async def _write_advice(self, key: tuple, report: dict):
+        try:
+            prompt = prompts.INSIGHT_CROWD.render(
+                destination=report["destination"],
+                date=report["date"],
+                weekday=report["weekday"],
+                quiet=report["best_time"],
+                busy=report["peak_time"],
+                spots=", ".join(f"{s['name']} (peak {s['density']}%, quietest {s['best_time']})" for s in report["major_spots"]) or "None",
+                events=", ".join(report["events"]) or "None",
+            )
+            text = await ai_service.generate_content(
+                prompt, system=prompts.INSIGHT_CROWD.system, max_tokens=120, route="insight", category="crowd"
+            )
+            if text and text != BUSY_MESSAGE and not text.startswith(("AI Error", "AI Service Unavailable")):
+                self._advice[key] = text.strip()
+                if len(self._advice) > ADVICE_CACHE:
+                    self._advice.popitem(last=False)
+        except Exception as e:
+            print(f"Crowd advice failed: {e}")
+        finally:
+            self._pending.discard(key)
+
+    # --- Model fallback ---
+
+    async def model_report(self, destination: str, day: Date = None) -> dict:
+        """
+        The crowd insight, with advice, for a destination the store doesn't know: the model
+        forecasts it as before, the answer seeds the store, and the report is rebuilt locally.
+        Uses the prior forecast if the model is unavailable or its answer is unusable.
+        """
+        day = day or Date.today()
+        insight = None
+        if ai_service.client is not None:
+            prompt = prompts.INSIGHT_CROWD_REPORT.render(
+                destination=destination, date=day.isoformat(), weekday=WEEKDAYS[day.weekday()]
+            )
+            raw = await ai_service.get_json_content(
+                prompt, system=prompts.INSIGHT_CROWD_REPORT.system, route="insight", category="crowd",
+                cacheable=_usable_insight,
+            )
+            try:
+                insight = json.loads(raw)
+            except (TypeError, ValueError):
+                insight = None
+            if not _usable_insight(insight):
+                insight = None
+        if insight is not None:
+            self.seed_from_insight(destination, insight, day)
+
+        report = self.report(destination, day)
+        advice = insight.get("advice") if insight else None
+        if isinstance(advice, str) and advice.strip():
+            report["advice"], report["advice_source"] = advice.strip(), "ai"
+        else:
+            report["advice"], report["advice_source"] = self._template_advice(report), "forecast"
+        return report
+
+    # --- Seeding ---
+
+    def _set_observed(self, row: int, curve: np.ndarray, day: Date, source: str):
+        """Stores a 24-hour curve seen on day (or on an unknown, typical day) as the row's weekly profile."""
+        if day is not None:
+            # Remove that date's seasonality and events so the profile describes a typical week
+            curve = curve / self.day_factors([row], [np.datetime64(day)])[0, 0]
+        weights = WEEKDAY_FACTORS / (WEEKDAY_FACTORS[day.weekday()] if day else WEEKDAY_FACTORS.mean())
+        self.store.hourly[row] = np.clip(curve[None, :] * weights[:, None], 0, 100).round().astype(np.uint8)
+        self.store.source[row] = SOURCES.index(source)
+
+    def seed_from_insight(self, destination: str, insight: dict, day: Date = None) -> int:
+        """
+        Turns a cached LLM crowd insight ({"hourly_forecast": [...], "major_spots": [...]})
+        into profiles. Returns the number of rows updated. Spots that aren't known attractions
+        of the destination are added as new ones.
+        """
+        store = self.store
+        key, city = place_key(destination)
+        city_row = store.row(city)
+        if city_row is None:
+            return 0
+        updated = 0
+
+        points = [(_parse_hour(p.get("time")), p.get("density")) for p in insight.get("hourly_forecast") or [] if isinstance(p, dict)]
+        points = sorted((h, float(d)) for h, d in points if h is not None and isinstance(d, (int, float)))
+        if len(points) >= 2:
+            hours, values = np.array(points).T
+            prior = _prior_day("city")
+            # Outside the reported hours keep the prior's shape, scaled to the reported level
+            scale = values.mean() / np.interp(hours, HOURS, prior).mean()
+            curve = np.where((HOURS >= hours[0]) & (HOURS <= hours[-1]), np.interp(HOURS, hours, values), prior * scale)
+            self._set_observed(city_row, curve, day, "llm")
+            updated += 1
+
+        for spot in insight.get("major_spots") or []:
+            if not isinstance(spot, dict) or not isinstance(spot.get("density"), (int, float)) or not spot.get("name"):
+                continue
+            match = destination_index.resolve(spot["name"])
+            if match is not None and match["match"] == "exact" and match["kind"] == "poi" and match["city"] == city:
+                row = store.row(match["id"], city=city)
+            else:
+                # Not a known attraction of this city: add it, scoped to the city so the name
+                # can't claim another place's row
+                spot_key = fold(spot["name"])
+                row = store.row(f"{city}/{spot_key}", city=city) if spot_key else None
+                if row is not None:
+                    store.names.setdefault(row, str(spot["name"]).strip())
+            if row is None:
+                continue
+            # Only the peak is reported; spread it over the attraction prior
+            curve = _prior_day("poi") * (float(spot["density"]) / _prior_day("poi").max())
+            self._set_observed(row, curve, day, "llm")
+            updated += 1
+        return updated
+
+    def import_dataset(self, path: str) -> int:
+        """
+        Imports a CSV with columns place,weekday,hour,density (weekday 0-6 from Monday, or a
+        name) and/or place,month,factor (month 1-12, factor as a multiplier). Returns rows read.
+        """
+        store = self.store
+        keys = {}
+
+        def row_of(text):
+            if text not in keys:
+                key, city = place_key(text)
+                keys[text] = store.row(key, city=city)
+            return keys[text]
+
+        hourly, monthly = [], []
+        with open(path, newline="", encoding="utf-8") as f:
+            for record in csv.DictReader(f):
+                if row_of(record["place"]) is None:
+                    continue
+                if record.get("hour") not in (None, ""):
+                    weekday = record["weekday"].strip()
+                    weekday = int(weekday) if weekday.isdigit() else [w[:3].lower() for w in WEEKDAYS].index(weekday[:3].lower())
+                    hourly.append((row_of(record["place"]), weekday, int(record["hour"]), float(record["density"])))
+                elif record.get("month") not in (None, ""):
+                    monthly.append((row_of(record["place"]), int(record["month"]) - 1, float(record["factor"])))
+
+        if hourly:
+            rows, weekdays, hours, values = (np.array(c) for c in zip(*hourly))
+            store.hourly[rows.astype(np.intp), weekdays.astype(np.intp), hours.astype(np.intp)] = np.clip(values, 0, 100).round()
+            store.source[np.unique(rows.astype(np.intp))] = SOURCES.index("dataset")
+        if monthly:
+            rows, months, factors = (np.array(c) for c in zip(*monthly))
+            store.monthly[rows.astype(np.intp), months.astype(np.intp)] = np.clip(factors * 100, 0, 255).round()
+            store.source[np.unique(rows.astype(np.intp))] = SOURCES.index("dataset")
+        return len(hourly) + len(monthly)
+
+crowd_forecaster = CrowdForecaster()
+
+if __name__ == "__main__":
+    # python -m app.services.crowd_forecast import popular_times.csv
+    # python -m app.services.crowd_forecast seed cached_insights.jsonl  ({"destination", "insight", "date"?} per line)
+    if len(sys.argv) != 3 or sys.argv[1] not in ("import", "seed"):
+        sys.exit("usage: python -m app.services.crowd_forecast (import FILE.csv | seed FILE.jsonl)")
+    command, path = sys.argv[1:]
+    if command == "import":
+        count = crowd_forecaster.import_dataset(path)
+    else:
+        count = 0
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    day = Date.fromisoformat(entry["date"]) if entry.get("date") else None
+                    count += crowd_forecaster.seed_from_insight(entry["destination"], entry["insight"], day)
+    crowd_forecaster.store.save()
+    print(f"Updated {count} profile entries in {crowd_forecaster.store.path}")
@@ -0,0 +1,199 @@
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from app.services.gazetteer import gazetteer, fold
+
+# Suggestions may be loose; resolve() feeds cache keys and geocoding, so it only accepts
+# near-identical spellings ("kyotto") that are unambiguous
+FUZZY_THRESHOLD = 0.5
+RESOLVE_THRESHOLD = 0.7
+RESOLVE_MAX_LENGTH_DIFF = 2
+RESOLVE_MARGIN = 0.1
+# Shorter names have too few trigrams to tell a typo from a different word
+RESOLVE_MIN_FUZZY_LENGTH = 6
+SEPARATOR = "\x00"
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class DestinationIndex:
+    """
+    Maps free-text destinations ("KYOTO ", "Kyōto", "Kyoto, Japan", "kyotto") to a canonical
+    gazetteer place id. Qualified names only match when the qualifier is the place's country or
+    city, so "Paris, Texas" stays unresolved.
+
+    Folded names and aliases are stored sorted in a single string with an offsets array, so a
+    prefix lookup is a binary search over a flattened trie instead of a tree of dict nodes.
+    Typos fall back to trigram (Dice) similarity over array-backed posting lists.
+    """
+    def __init__(self, source=gazetteer):
+        self.source = source
+        self._loaded = False
+
+    def _load(self):
+        places = self.source.places
+        entries = self.source.names
+        keys = sorted(entries)
+
+        self._blob = SEPARATOR.join(keys)
+        self._offsets = array("I", [0])
+        for key in keys:
+            self._offsets.append(self._offsets[-1] + len(key) + 1)
+        self._key_place = array("H", (entries[k] for k in keys))
+        self._key_grams = array("B", (min(len(trigrams(k)), 255) for k in keys))
+
+        postings = {}
+        for key_index, key in enumerate(keys):
+            for gram in trigrams(key):
+                postings.setdefault(gram, array("H")).append(key_index)
+        self._postings = postings
+        self._countries = sorted({fold(p["country"]) for p in places}, key=len, reverse=True)
+        self._loaded = True
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._load()
+
+    def _key_at(self, i: int) -> str:
+        return self._blob[self._offsets[i]:self._offsets[i + 1] - 1]
+
+    def _describe(self, place_index: int, match: str, score: float) -> dict:
+        place = self.source.places[place_index]
+        return {
+            "id": place["id"],
+            "name": place["name"],
+            "country": place["country"],
+            "kind": place["kind"],
+            "city": place.get("city", place["id"]),
+            "label": f"{place['name']}, {place['country']}",
+            "match": match,
+            "score": round(score, 3),
+        }
+
+    def _exact(self, key: str):
+        n = len(self._key_place)
+        i = bisect_left(range(n), key, key=self._key_at)
+        if i < n and self._key_at(i) == key:
+            return self._key_place[i]
+        return None
+
+    def _prefix_range(self, prefix: str) -> range:
+        n = len(self._key_place)
+        start = bisect_left(range(n), prefix, key=self._key_at)
+        # Every key starting with prefix sorts before prefix + the highest code point
+        end = bisect_left(range(start, n), prefix + "\U0010ffff", key=self._key_at) + start
+        return range(start, end)
+
+    def _fuzzy_keys(self, key: str, limit: int):
+        """(key index, Dice score) of the closest names, best first."""
+        grams = trigrams(key)
+        shared = {}
+        for gram in grams:
+            for key_index in self._postings.get(gram, ()):
+                shared[key_index] = shared.get(key_index, 0) + 1
+        scored = []
+        for key_index, count in shared.items():
+            score = 2 * count / (len(grams) + self._key_grams[key_index])
+            if score >= FUZZY_THRESHOLD:
+                scored.append((score, key_index))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return [(i, score) for score, i in scored[:limit]]
+
+    def _fuzzy(self, key: str, limit: int):
+        return [(self._key_place[i], score) for i, score in self._fuzzy_keys(key, limit)]
+
+    def _candidates(self, text: str) -> list:
+        """
+        (name, qualifiers) readings of text: the whole folded text, the first comma part
+        qualified by the rest, and the text without a trailing country.
+        """
+        key = fold(text)
+        candidates = [(key, ())]
+        parts = [fold(part) for part in text.split(",")]
+        if len(parts) > 1:
+            candidates.append((parts[0], tuple(p for p in parts[1:] if p)))
+        for country in self._countries:
+            if key.endswith(" " + country):
+                candidates.append((key[:-len(country) - 1], (country,)))
+                break
+        return [(name, qualifiers) for name, qualifiers in candidates if name]
+
+    def _qualified(self, place_index: int, qualifiers: tuple) -> bool:
+        """Whether every qualifier names the place's country or city ("Kyoto Prefecture" counts)."""
+        place = self.source.places[place_index]
+        city = self.source.get(place.get("city")) or place
+        allowed = {fold(place["country"]), fold(place["name"]), fold(city["name"])}
+        return all(any(f" {a} " in f" {q} " for a in allowed) for q in qualifiers)
+
+    def _close_match(self, key: str):
+        """The single place whose name is a near-identical spelling of key, or None."""
+        if len(key) < RESOLVE_MIN_FUZZY_LENGTH:
+            return None
+        best, runner_up = None, 0.0
+        for key_index, score in self._fuzzy_keys(key, 4):
+            place_index = self._key_place[key_index]
+            if best is None:
+                if score < RESOLVE_THRESHOLD or abs(len(self._key_at(key_index)) - len(key)) > RESOLVE_MAX_LENGTH_DIFF:
+                    return None
+                best = (place_index, score)
+            elif place_index != best[0]:
+                runner_up = score
+                break
+        if best is None or best[1] - runner_up < RESOLVE_MARGIN:
+            return None
+        return best
+
+    @lru_cache(maxsize=8192)
+    def resolve(self, text: str):
+        """
+        Returns the place text unambiguously names, or None. Use suggest() for loose matching;
+        callers treat None as "unknown place" and fall back to the folded text.
+        """
+        self._ensure_loaded()
+        candidates = self._candidates(text or "")
+        for key, qualifiers in candidates:
+            place_index = self._exact(key)
+            if place_index is not None and self._qualified(place_index, qualifiers):
+                return self._describe(place_index, "exact", 1.0)
+        for key, qualifiers in candidates:
+            match = self._close_match(key)
+            if match is not None and self._qualified(match[0], qualifiers):
+                return self._describe(match[0], "fuzzy", match[1])
+        return None
+
+    def suggest(self, query: str, limit: int = 8) -> list:
+        """Autocomplete suggestions: prefix matches (cities first), topped up with fuzzy matches."""
+        self._ensure_loaded()
+        key = fold(query)
+        if not key:
+            return []
+        seen, prefixed = set(), []
+        for i in self._prefix_range(key):
+            place_index = self._key_place[i]
+            if place_index not in seen:
+                seen.add(place_index)
+                prefixed.append(place_index)
+        places = self.source.places
+        prefixed.sort(key=lambda p: (places[p]["kind"] != "city", len(places[p]["name"]), places[p]["name"]))
+        results = [self._describe(p, "prefix", 1.0) for p in prefixed[:limit]]
+        if len(results) < limit and len(key) >= 3:
+            for place_index, score in self._fuzzy(key, limit * 2):
+                if place_index not in seen:
+                    seen.add(place_index)
+                    results.append(self._describe(place_index, "fuzzy", score))
+                    if len(results) == limit:
+                        break
+        return results
+
+    def city_id(self, text: str):
+        """The canonical city id for a destination (POIs map to their city), or None."""
+        match = self.resolve(text)
+        return match["city"] if match else None
+
+    def destination_key(self, text: str) -> str:
+        """A stable cache key: the canonical place id if resolved, otherwise the folded text."""
+        match = self.resolve(text)
+        return match["id"] if match else fold(text)
+
+destination_index = DestinationIndex()
@@ -0,0 +1,99 @@
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "gazetteer.json")
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+# Shorter names and aliases ("la", "ny", "rio") only match when they are the whole text
+MIN_CONTAINED_NAME_LENGTH = 4
+
+def fold(text: str) -> str:
+    """Lowercases, strips accents and collapses punctuation so spelling variants compare equal."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD_RE.sub(" ", stripped.casefold()).strip()
+
+class Gazetteer:
+    """
+    Offline lookup of cities and points of interest bundled in app/data/gazetteer.json.
+    Loaded lazily on first use.
+    """
+    def __init__(self, path: str = GAZETTEER_PATH):
+        self.path = path
+        self._places = None
+        self._by_name = None
+        self._names_longest_first = None
+        self._by_id = None
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            places = json.load(f)["places"]
+        by_name = {}
+        for index, place in enumerate(places):
+            for name in [place["name"], *place.get("aliases", [])]:
+                key = fold(name)
+                # Cities win over POIs that share a name
+                if key and (key not in by_name or place["kind"] == "city"):
+                    by_name[key] = index
+        self._places = places
+        self._by_id = {place["id"]: index for index, place in enumerate(places)}
+        self._by_name = by_name
+        self._names_longest_first = sorted(by_name, key=len, reverse=True)
+
+    @property
+    def places(self) -> list:
+        if self._places is None:
+            self._load()
+        return self._places
+
+    @property
+    def names(self) -> dict:
+        """Folded name or alias -> index into places."""
+        if self._places is None:
+            self._load()
+        return self._by_name
+
+    def get(self, place_id: str):
+        if self._places is None:
+            self._load()
+        index = self._by_id.get(place_id)
+        return None if index is None else self._places[index]
+
+    def in_city(self, place: dict, city_id: str) -> bool:
+        return place["id"] == city_id or place.get("city") == city_id
+
+    @lru_cache(maxsize=4096)
+    def geocode(self, text: str, city_id: str = None):
+        """
+        Resolves free text such as "Fushimi Inari Shrine, Kyoto" to (lat, lng).
+        The whole text may name any known place; with city_id it must be inside that city.
+        Otherwise the longest contained name wins: one of city_id's places, or any point of
+        interest when no city is given, never a city abroad ("Nice sunset dinner") and never
+        a name shorter than MIN_CONTAINED_NAME_LENGTH ("la", "sf"). Returns None when nothing matches.
+        """
+        key = fold(text)
+        if not key:
+            return None
+        places = self.places
+        index = self._by_name.get(key)
+        if index is not None and city_id and not self.in_city(places[index], city_id):
+            index = None
+        if index is None:
+            padded = f" {key} "
+            for name in self._names_longest_first:
+                if len(name) < MIN_CONTAINED_NAME_LENGTH:
+                    break
+                if f" {name} " not in padded:
+                    continue
+                place = places[self._by_name[name]]
+                if self.in_city(place, city_id) if city_id else place["kind"] == "poi":
+                    index = self._by_name[name]
+                    break
+        if index is None:
+            return None
+        return places[index]["lat"], places[index]["lng"]
+
+gazetteer = Gazetteer()
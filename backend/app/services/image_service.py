@@ -1,20 +1,34 @@
 from duckduckgo_search import DDGS
+from app.services.shared_cache import response_cache
 
-# Initialize a single DDGS instance to reuse if needed
-ddgs = DDGS()
+IMAGE_CACHE_TTL = 7 * 24 * 3600
 
-def fetch_image_for_location(query: str) -> str:
-    """
-    Searches for an image URL using DuckDuckGo Images.
-    Returns a URL string or None if not found.
-    """
+image_cache = response_cache.namespace("image", IMAGE_CACHE_TTL)
+
+# One DDGS session per worker, created on first use or at warm-up
+_ddgs = None
+
+def get_ddgs() -> DDGS:
+    global _ddgs
+    if _ddgs is None:
+        _ddgs = DDGS()
+    return _ddgs
+
+def _search_image(query: str) -> str:
     try:
         # Search for images with SafeSearch on
-        results = list(ddgs.images(query, max_results=1))
+        results = list(get_ddgs().images(query, max_results=1))
         if results and len(results) > 0:
             return results[0].get('image')
     except Exception as e:
         print(f"Image search error for {query}: {e}")
         return None
-    
+
     return None
+
+def fetch_image_for_location(query: str) -> str:
+    """
+    Searches for an image URL using DuckDuckGo Images.
+    Returns a URL string or None if not found. Found URLs are shared by all workers.
+    """
+    return image_cache.get_or_compute(query.strip().lower(), lambda: _search_image(query))
@@ -0,0 +1,141 @@
+import os
+import random
+import secrets
+import time
+from collections import deque
+from contextlib import nullcontext
+from contextvars import ContextVar
+from itertools import count
+
+# Profiling is off unless a token or a sample rate is configured. When it is off the
+# middleware is not installed and span() returns a shared no-op context.
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_BUFFER = int(os.getenv("PROFILE_BUFFER", "500"))
+PROFILE_HEADER = "x-profile-token"
+
+_NOOP = nullcontext()
+_active = ContextVar("profile", default=None)
+_ids = count(1)
+
+class Profile:
+    __slots__ = ("id", "method", "path", "status", "sampled", "started_at", "duration", "frames", "_stack", "_start")
+
+    def __init__(self, method: str, path: str, sampled: bool):
+        self.id = next(_ids)
+        self.method = method
+        self.path = path
+        self.status = None
+        self.sampled = sampled
+        self.started_at = time.time()
+        self.duration = 0.0
+        # (stage, substage, ...) -> seconds, summed over repeated spans
+        self.frames = {}
+        self._stack = []
+        self._start = time.perf_counter()
+
+    def finish(self, status: int):
+        self.status = status
+        self.duration = time.perf_counter() - self._start
+
+    def stages(self) -> dict:
+        """Top-level stage durations in ms, with the remainder (routing, validation, encoding) as "other"."""
+        stages = {key[0]: 1000 * seconds for key, seconds in self.frames.items() if len(key) == 1}
+        stages["other"] = max(0.0, 1000 * self.duration - sum(stages.values()))
+        return {name: round(ms, 3) for name, ms in stages.items()}
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "sampled": self.sampled,
+            "started_at": self.started_at,
+            "duration_ms": round(1000 * self.duration, 3),
+            "stages": self.stages(),
+        }
+
+class _Span:
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile: Profile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.profile._stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profile._stack
+        key = tuple(stack)
+        self.profile.frames[key] = self.profile.frames.get(key, 0.0) + elapsed
+        stack.pop()
+        return False
+
+class Profiler:
+    def __init__(self, token: str = PROFILE_TOKEN, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 capacity: int = PROFILE_BUFFER):
+        self.token = token
+        self.sample_rate = sample_rate
+        self.profiles = deque(maxlen=capacity)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token) or self.sample_rate > 0
+
+    def authorized(self, token: str) -> bool:
+        return bool(self.token) and bool(token) and secrets.compare_digest(token, self.token)
+
+    def should_profile(self, token: str):
+        """None to skip, otherwise whether the request was sampled (False = requested by header)."""
+        if token and self.authorized(token):
+            return False
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return True
+        return None
+
+    def span(self, name: str):
+        profile = _active.get()
+        return _NOOP if profile is None else _Span(profile, name)
+
+    def start(self, method: str, path: str, sampled: bool):
+        profile = Profile(method, path, sampled)
+        return profile, _active.set(profile)
+
+    def finish(self, profile: Profile, token, status: int):
+        _active.reset(token)
+        profile.finish(status)
+        self.profiles.append(profile)
+
+    def recent(self, limit: int = None, path: str = None) -> list:
+        profiles = [p for p in self.profiles if path is None or p.path == path]
+        return profiles[-limit:] if limit else profiles
+
+    def folded(self, profiles: list) -> str:
+        """
+        Collapsed stacks ("POST /api/ai/plan;upstream 812345"), one line per stack with
+        microseconds as the sample count. Feed to flamegraph.pl or speedscope.
+        """
+        totals = {}
+        for p in profiles:
+            root = f"{p.method} {p.path}"
+            children = 0.0
+            for key, seconds in p.frames.items():
+                stack = (root,) + key
+                totals[stack] = totals.get(stack, 0.0) + seconds
+                if len(key) == 1:
+                    children += seconds
+            totals[(root,)] = totals.get((root,), 0.0) + max(0.0, p.duration - children)
+            # Nested spans are counted inside their parent; folded format wants self time
+            for key, seconds in p.frames.items():
+                if len(key) > 1:
+                    parent = (root,) + key[:-1]
+                    totals[parent] = totals.get(parent, 0.0) - seconds
+        samples = ((";".join(stack), round(seconds * 1e6)) for stack, seconds in sorted(totals.items()))
+        return "".join(f"{stack} {micros}\n" for stack, micros in samples if micros > 0)
+
+profiler = Profiler()
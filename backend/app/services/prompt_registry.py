@@ -0,0 +1,349 @@
+import json
+import re
+import threading
+from textwrap import dedent
+
+# --- Local tokenizer ---
+# Uses tiktoken when it is installed, otherwise a regex approximation of the
+# Llama 3 pre-tokenizer. Either way nothing leaves the process.
+
+_PRETOKEN_RE = re.compile(
+    r"(?i:'s|'t|'re|'ve|'m|'ll|'d)|[^\r\n\w]?[^\W\d_]+|\d{1,3}| ?[^\s\w]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"
+)
+_encoder = None
+_encoder_loaded = False
+
+def _get_encoder():
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoder = None
+    return _encoder
+
+def count_tokens(text: str) -> int:
+    """Counts tokens in text locally."""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder:
+        return len(encoder.encode(text, disallowed_special=()))
+    # Long words are usually split into several BPE pieces
+    return sum(1 + (len(piece) - 1) // 5 for piece in _PRETOKEN_RE.findall(text))
+
+# --- Minification ---
+
+_INLINE_SPACE_RE = re.compile(r"[ \t]+")
+
+def minify(text: str) -> str:
+    """Strips indentation, blank lines and repeated spaces from a prompt."""
+    lines = (_INLINE_SPACE_RE.sub(" ", line).strip() for line in dedent(text).splitlines())
+    return "\n".join(line for line in lines if line)
+
+def compact_schema(schema) -> str:
+    """Serializes a JSON schema skeleton without any whitespace."""
+    return json.dumps(schema, separators=(",", ":"), ensure_ascii=False)
+
+# --- Templates ---
+
+class PromptTemplate:
+    """
+    A prompt compiled once at import time.
+    The system part is static so every request shares the same prefix
+    (which is what provider-side prompt caching keys on); only the user
+    part is rendered per request.
+    """
+    def __init__(self, name: str, user: str, system: str = None):
+        self.name = name
+        self.system = minify(system) if system else None
+        self.user = minify(user)
+
+    def render(self, **values) -> str:
+        try:
+            return self.user.format_map(values)
+        except KeyError as e:
+            raise KeyError(f"Prompt '{self.name}' is missing a value for {e}") from None
+
+class PromptRegistry:
+    def __init__(self):
+        self._templates = {}
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        self._templates[template.name] = template
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._templates
+
+# --- Token accounting ---
+
+class TokenLedger:
+    """Thread-safe prompt/completion token totals per route and category."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, route: str, category: str, prompt_tokens: int, completion_tokens: int):
+        key = (route, category or "default")
+        with self._lock:
+            entry = self._totals.setdefault(key, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            report = {}
+            for (route, category), entry in sorted(self._totals.items()):
+                report.setdefault(route, {})[category] = {
+                    **entry,
+                    "total_tokens": entry["prompt_tokens"] + entry["completion_tokens"],
+                }
+            return report
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+# --- Output budgets ---
+
+# Measured with count_tokens on realistic completions for this schema (bench_prompts.py):
+# one activity with lat/lng, ai_reasoning and two alternatives is ~300 tokens when the model
+# pretty-prints, and a day's header ~60. Budgets leave headroom; they only stop runaway output.
+PLAN_BASE_TOKENS = 400
+PLAN_DAY_TOKENS = 100
+PLAN_ACTIVITY_TOKENS = 320
+# Activities per day to budget for, including meals and transfers
+PLAN_ACTIVITIES_BY_PACE = {"relaxed": 5, "moderate": 6, "fast-paced": 9}
+PLAN_DEFAULT_ACTIVITIES = 7
+MODEL_MAX_COMPLETION_TOKENS = 32768
+
+def plan_max_tokens(duration_days: int, pace: str = None) -> int:
+    """Completion budget for an itinerary, scaled by the number of days and the pace."""
+    days = max(1, duration_days or 1)
+    activities = PLAN_ACTIVITIES_BY_PACE.get((pace or "").strip().lower(), PLAN_DEFAULT_ACTIVITIES)
+    per_day = PLAN_DAY_TOKENS + PLAN_ACTIVITY_TOKENS * activities
+    return min(PLAN_BASE_TOKENS + per_day * days, MODEL_MAX_COMPLETION_TOKENS)
+
+# --- Prompt definitions ---
+
+JSON_SYSTEM = "You are a helpful assistant that outputs only valid JSON."
+
+ITINERARY_SCHEMA = {
+    "trip_summary": {
+        "title": "str",
+        "description": "short vibe overview",
+        "sustainability_score": "int 1-10",
+        "estimated_total_cost": "str",
+    },
+    "days": [{
+        "day": 1,
+        "date": "str",
+        "theme": "str",
+        "weather_prediction": "str e.g. Sunny, 24°C",
+        "activities": [{
+            "time": "str e.g. 10:00 AM",
+            "title": "str",
+            "type": "transport|hotel|food|activity|break",
+            "description": "str",
+            "location": "str",
+            "lat": "num",
+            "lng": "num",
+            "cost_estimate": "str",
+            "crowd_prediction": "Low|Moderate|High|Extreme",
+            "ai_reasoning": "str why it fits the user",
+            "alternatives": [{"title": "str", "reason": "str e.g. If rain"}],
+        }],
+    }],
+}
+
+registry = PromptRegistry()
+
+CHAT = registry.register(PromptTemplate(
+    "chat",
+    system="""
+    You are an expert AI Travel Companion for TravelMind.
+    Provide a helpful, friendly, and expert response. Keep it concise (under 100 words) unless asked for details.
+    """,
+    user="""
+    Context: The user is interested in {context}.
+    User: {message}
+    """,
+))
+
+PLAN = registry.register(PromptTemplate(
+    "plan",
+    system=f"""
+    {JSON_SYSTEM}
+    You are the 'TravelMind Intelligence Engine', an advanced AI travel planner.
+    Your goal is to create a hyper-personalized, logistic-optimized travel itinerary.
+
+    CRITICAL OUTPUT RULES:
+    1. Respond ONLY with valid JSON.
+    2. Do NOT act like a chatbot. Do not say "Here is your plan". Just JSON.
+    3. The JSON must match this schema: {compact_schema(ITINERARY_SCHEMA)}
+
+    OPTIMIZATION CRITERIA:
+    - Pacing: Respect the user's requested pace (Relaxed = max 3 activities/day).
+    - Context: heavily weigh the user's specific request for intent (e.g., if they say "I hate waking up early", start days at 11 AM).
+    - Explainability: Every choice must have an "ai_reasoning" field explaining WHY it fits.
+    """,
+    user="""
+    TRIP DETAILS:
+    - Destination: {destination}
+    - Duration: {duration_days} days
+    - Dates: {dates}
+    - Budget: {budget}
+    - Group Size: {group_size} people
+
+    USER PREFERENCES:
+    - Pace: {pace}
+    - Styles: {styles}
+    - Constraints: {accessibility}, {dietary_restrictions}
+    - Specific Request (Intent): "{intent}"
+    """,
+))
+
+REPLAN = registry.register(PromptTemplate(
+    "replan",
+    system=JSON_SYSTEM,
+    user="""
+    MODIFY the previous request for {destination} because of a sudden change: {trigger}.
+    Example: If rain, replace outdoor activities with museums/cafes.
+
+    Generate a 1-day adjusted plan example (just Day 1) to demonstrate adaptation.
+    Return JSON format similar to the main planner but just for one day.
+    """,
+))
+
+# Densities come from the local crowd forecast; the model only writes the advice text
+INSIGHT_CROWD = registry.register(PromptTemplate(
+    "insight.crowd",
+    system="""
+    You are a travel crowd analyst. Using only the forecast given, write one specific tip
+    (at most 2 sentences) for avoiding crowds. Plain text, no preamble.
+    """,
+    user="""
+    Destination: {destination}
+    Date: {date} ({weekday})
+    Quietest hour: {quiet}
+    Busiest hour: {busy}
+    Busiest spots: {spots}
+    Events: {events}
+    """,
+))
+
+# Only for destinations outside the crowd profile store; the answer seeds the store
+INSIGHT_CROWD_REPORT = registry.register(PromptTemplate(
+    "crowd.report",
+    system=f"""
+    {JSON_SYSTEM}
+    Provide a crowd intelligence report for the destination on the given date.
+    Include:
+    1. 'hourly_forecast': Array of 7 objects with 'time' (8AM to 8PM) and 'density' (0-100).
+    2. 'major_spots': Array of 3 key attractions with 'name', 'status' (Low/Moderate/High), 'density' (0-100), and 'wait_time' (mins).
+    3. 'advice': A specific tip to avoid crowds.
+    Return ONLY valid JSON.
+    """,
+    user="""
+    Destination: {destination}
+    Date: {date} ({weekday})
+    """,
+))
+
+INSIGHT_SAFETY = registry.register(PromptTemplate(
+    "insight.safety",
+    system=f"""
+    {JSON_SYSTEM}
+    Provide a live safety intelligence report for the destination.
+    Include:
+    1. 'score': Safety rating (0-100).
+    2. 'status': Brief status (e.g., 'Very Safe', 'Exercise Caution').
+    3. 'advisories': List of 3 specific current safety tips for tourists.
+    4. 'emergency': Emergency phone number.
+    5. 'risks': List of 3 potential risks (e.g., 'Pickpockets in Metro', 'Sun Exposure').
+    Return ONLY valid JSON.
+    """,
+    user="Destination: {destination}",
+))
+
+INSIGHT_BUDGET = registry.register(PromptTemplate(
+    "insight.budget",
+    system=f"""
+    {JSON_SYSTEM}
+    Provide a professional smart budget saving report for the destination.
+    Include:
+    1. 'savings_strategies': 3 specific tips to save money there.
+    2. 'cost_index': Relative cost for food, transport, and hotels (Low/Mid/High).
+    3. 'hidden_deals': 2 specific local gems that are cheap or free.
+    4. 'budget_analysis': A 2-sentence expert summary of how to manage the user's budget there.
+    5. 'suggested_split': {{"Accommodation": %, "Food": %, "Transport": %, "Activities": %}} based on the destination.
+    6. 'top_priority_save': The single best way to save money here.
+    7. 'typical_expenses': List of 5 typical tourist expenses (e.g. 'Coffee', 'Quick Lunch', 'Local Transport') with estimated local prices.
+    Return ONLY valid JSON.
+    """,
+    user="""
+    Destination: {destination}
+    Budget: {budget}
+    """,
+))
+
+INSIGHT_SUSTAINABILITY = registry.register(PromptTemplate(
+    "insight.sustainability",
+    system=f"""
+    {JSON_SYSTEM}
+    Provide a live sustainability / eco-travel report for the destination.
+    Include:
+    1. 'footprint_data': Array of 3 objects with 'name' (Flights, Hotel, Transport), 'value' (CO2 in kg), and 'color' (hex).
+    2. 'eco_swaps': Array of 2 objects with 'original' (bad option), 'swap' (good option), 'co2_saved' (kg), and 'financial_save' (string).
+    3. 'local_eco_status': A specific eco-fact about the destination.
+    Return ONLY valid JSON.
+    """,
+    user="Destination: {destination}",
+))
+
+INSIGHT_REVIEWS = registry.register(PromptTemplate(
+    "insight.reviews",
+    system=f"""
+    {JSON_SYSTEM}
+    Provide a real-time sentiment and review report for the destination and any places listed.
+    Include:
+    1. 'trust_score': Overall rating (0-5.0).
+    2. 'pros': List of 3 strings (What people love).
+    3. 'cons': List of 3 strings (Common complaints).
+    4. 'reviews': Array of 3 objects with 'author', 'rating' (1-5), 'title', 'text', 'sentiment' (Positive/Neutral/Negative), and 'date' (e.g., '3 days ago').
+    - Ensure reviews feel real, specific to the destination and the mentioned places, and reflect actual traveler feedback.
+    5. 'ai_summary': A concise summary of the overall vibe.
+    Return ONLY valid JSON.
+    """,
+    user="""
+    Destination: {destination}
+    Places: {places}
+    """,
+))
+
+INSIGHT_GENERIC = registry.register(PromptTemplate(
+    "insight.generic",
+    system=JSON_SYSTEM,
+    user="Provide a generic travel intelligence report for {destination} regarding {category}. Return JSON.",
+))
+
+# Categories /insight renders from a template. Crowd insights are forecast locally, so the
+# crowd prompts are used by the forecaster only and can't be selected here.
+INSIGHT_TEMPLATES = {
+    "safety": INSIGHT_SAFETY,
+    "budget": INSIGHT_BUDGET,
+    "sustainability": INSIGHT_SUSTAINABILITY,
+    "reviews": INSIGHT_REVIEWS,
+}
+
+def insight_template(category: str) -> PromptTemplate:
+    return INSIGHT_TEMPLATES.get(category, INSIGHT_GENERIC)
+
+token_ledger = TokenLedger()
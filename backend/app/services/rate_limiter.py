@@ -0,0 +1,143 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+
+class RateLimit:
+    """
+    `requests` per `period` seconds, enforced with GCRA (generic cell rate algorithm).
+    This is a sliding window without buckets: each key stores a single theoretical arrival time.
+    """
+    def __init__(self, requests: int, period: float):
+        self.requests = requests
+        self.period = float(period)
+        self.interval = self.period / requests
+
+    def __repr__(self):
+        return f"RateLimit({self.requests}/{self.period:g}s)"
+
+def _gcra(tat, now: float, limit: RateLimit):
+    """Returns (new_tat or None if rejected, retry_after seconds)."""
+    tat = max(tat or now, now)
+    new_tat = tat + limit.interval
+    allow_at = new_tat - limit.period
+    if now < allow_at:
+        return None, allow_at - now
+    return new_tat, 0.0
+
+class MemoryBackend:
+    """Per-process state. Each worker enforces its own limits."""
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._tats = {}
+
+    def acquire(self, key: str, limit: RateLimit, now: float):
+        with self._lock:
+            new_tat, retry_after = _gcra(self._tats.get(key), now, limit)
+            if new_tat is not None:
+                if len(self._tats) >= self.max_keys and key not in self._tats:
+                    self._prune(now)
+                self._tats[key] = new_tat
+            return new_tat is not None, retry_after
+
+    def _prune(self, now: float):
+        expired = [k for k, tat in self._tats.items() if tat <= now]
+        for k in expired:
+            del self._tats[k]
+        if len(self._tats) >= self.max_keys:
+            self._tats.clear()
+
+class SQLiteBackend:
+    """
+    State shared by every worker on the host through a WAL-mode SQLite file. Checks run on the
+    event loop, so a check that can't get the write lock within BUSY_TIMEOUT is allowed rather
+    than stalling every request in the worker.
+    """
+    PRUNE_EVERY = 1000
+    BUSY_TIMEOUT = 0.05
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        self.skipped = 0
+        with sqlite3.connect(self.path, timeout=5) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Setup above may wait on other workers starting; checks afterwards may not
+            conn.execute(f"PRAGMA busy_timeout={int(self.BUSY_TIMEOUT * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    def acquire(self, key: str, limit: RateLimit, now: float):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            return self._skip(e)
+        try:
+            row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            new_tat, retry_after = _gcra(row[0] if row else None, now, limit)
+            if new_tat is not None:
+                conn.execute("INSERT OR REPLACE INTO rate_limits (key, tat) VALUES (?, ?)", (key, new_tat))
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if isinstance(e, sqlite3.OperationalError):
+                return self._skip(e)
+            raise
+        return new_tat is not None, retry_after
+
+    def _skip(self, e: sqlite3.OperationalError):
+        # Fail open: a missed check costs less than a stalled worker
+        self.skipped += 1
+        if self.skipped % 100 == 1:
+            print(f"Rate limit check skipped ({self.skipped} so far): {e}")
+        return True, 0.0
+
+class RateLimiter:
+    def __init__(self, backend, limits: dict):
+        self.backend = backend
+        self.limits = limits
+
+    def check(self, scope: str, identity: str):
+        """Returns (allowed, retry_after_seconds) for one request by identity against scope's limit."""
+        limit = self.limits.get(scope)
+        if limit is None or self.backend is None:
+            return True, 0
+        allowed, retry_after = self.backend.acquire(f"{scope}:{identity}", limit, time.time())
+        return allowed, math.ceil(retry_after)
+
+# Per-route limits. "ip" applies to every /api request before authentication.
+ROUTE_LIMITS = {
+    "ip": RateLimit(300, 60),
+    "chat": RateLimit(20, 60),
+    "plan": RateLimit(5, 60),
+    "replan": RateLimit(10, 60),
+    "insight": RateLimit(30, 60),
+    "videos": RateLimit(30, 60),
+}
+
+def _make_backend():
+    # RATE_LIMIT_BACKEND=sqlite shares limits across workers on one host; "off" disables them (load tests)
+    backend = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    if backend == "off":
+        return None
+    if backend == "sqlite":
+        return SQLiteBackend(os.getenv("RATE_LIMIT_DB", "./rate_limits.db"))
+    return MemoryBackend()
+
+rate_limiter = RateLimiter(_make_backend(), ROUTE_LIMITS)
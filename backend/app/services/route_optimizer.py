@@ -0,0 +1,236 @@
+import numpy as np
+from app.services.gazetteer import gazetteer
+from app.services.destination_index import destination_index
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Meals, hotel check-ins and transport (arrivals, departures, transfers) keep their time slot
+# and day; everything else may be reordered
+FIXED_TYPES = {"food", "hotel", "transport"}
+
+CLUSTER_ITERATIONS = 6
+
+# Points further than this from the destination's centre (wrong model coordinates, a
+# same-named place abroad) are left unlocated rather than stretching the route
+CITY_RADIUS_KM = 150.0
+
+def haversine_matrix(coords: np.ndarray, other: np.ndarray = None) -> np.ndarray:
+    """Great-circle distances in km between (lat, lng) rows of coords and other."""
+    a = np.radians(coords)
+    b = a if other is None else np.radians(other)
+    dlat = a[:, None, 0] - b[None, :, 0]
+    dlng = a[:, None, 1] - b[None, :, 1]
+    h = np.sin(dlat / 2) ** 2 + np.cos(a[:, None, 0]) * np.cos(b[None, :, 0]) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+def _model_coords(activity: dict):
+    """Coordinates the model returned itself, in any of the common shapes."""
+    for lat_key, lng_key in (("lat", "lng"), ("lat", "lon"), ("latitude", "longitude")):
+        if lat_key in activity and lng_key in activity:
+            try:
+                return float(activity[lat_key]), float(activity[lng_key])
+            except (TypeError, ValueError):
+                return None
+    coords = activity.get("coordinates")
+    try:
+        if isinstance(coords, dict):
+            return float(coords["lat"]), float(coords.get("lng", coords.get("lon")))
+        if isinstance(coords, (list, tuple)) and len(coords) == 2:
+            return float(coords[0]), float(coords[1])
+    except (KeyError, TypeError, ValueError):
+        pass
+    return None
+
+class RouteOptimizer:
+    """
+    Deterministic post-processing for generated itineraries.
+    Moves reorderable activities between days so each day is geographically compact,
+    then orders each day with nearest neighbour + 2-opt while meals, hotels and transport
+    stay in their slots. The first and last activity of a day never change day.
+    """
+
+    def locate(self, activity: dict, city_id: str = None):
+        coords = _model_coords(activity)
+        if coords is None:
+            for field in ("location", "title"):
+                text = activity.get(field)
+                if isinstance(text, str) and text:
+                    coords = gazetteer.geocode(text, city_id)
+                    if coords is not None:
+                        break
+        if coords is None or not city_id:
+            return coords
+        city = gazetteer.get(city_id)
+        if city is not None:
+            distance = haversine_matrix(np.asarray([coords]), np.asarray([[city["lat"], city["lng"]]]))[0, 0]
+            if distance > CITY_RADIUS_KM:
+                return None
+        return coords
+
+    @staticmethod
+    def _path_cost(path, dist: np.ndarray) -> float:
+        located = [p for p in path if p >= 0]
+        if len(located) < 2:
+            return 0.0
+        located = np.asarray(located)
+        return float(dist[located[:-1], located[1:]].sum())
+
+    def _order_day(self, slots: list, movable: list, dist: np.ndarray) -> list:
+        """
+        slots holds the point index of a fixed item (or -1 if it has no coordinates)
+        and None for every free slot. Returns slots filled with the given movable points.
+        """
+        free = [i for i, s in enumerate(slots) if s is None]
+        if len(movable) < 2:
+            path = list(slots)
+            for i, p in zip(free, movable):
+                path[i] = p
+            return path
+
+        # Nearest neighbour, walking the day in slot order
+        remaining = list(movable)
+        path = list(slots)
+        current = -1
+        for i, slot in enumerate(slots):
+            if slot is not None:
+                if slot >= 0:
+                    current = slot
+                continue
+            if current < 0:
+                # Nothing located yet today: start near the next fixed anchor, if any
+                current = next((s for s in slots[i:] if s is not None and s >= 0), -1)
+            choice = min(remaining, key=lambda p: dist[current, p]) if current >= 0 else remaining[0]
+            remaining.remove(choice)
+            path[i] = current = choice
+
+        # 2-opt over the sequence of free slots
+        order = [path[i] for i in free]
+        best = self._path_cost(path, dist)
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(order) - 1):
+                for j in range(i + 1, len(order)):
+                    candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                    trial = list(path)
+                    for slot, p in zip(free, candidate):
+                        trial[slot] = p
+                    cost = self._path_cost(trial, dist)
+                    if cost < best - 1e-9:
+                        order, path, best, improved = candidate, trial, cost, True
+        return path
+
+    @staticmethod
+    def _balanced_assign(points: np.ndarray, centroids: np.ndarray, capacity: list) -> np.ndarray:
+        """Greedy capacity-constrained assignment of points to their nearest centroid."""
+        dist = haversine_matrix(points, centroids)
+        assignment = np.full(len(points), -1)
+        left = list(capacity)
+        for flat in np.argsort(dist, axis=None):
+            point, cluster = divmod(int(flat), len(centroids))
+            if assignment[point] < 0 and left[cluster] > 0:
+                assignment[point] = cluster
+                left[cluster] -= 1
+        return assignment
+
+    def _cluster_days(self, day_movable: list, day_anchors: list, coords: np.ndarray) -> list:
+        """Regroups movable points across days, keeping each day's activity count (its pace)."""
+        capacity = [len(m) for m in day_movable]
+        points = [p for m in day_movable for p in m]
+        if len(points) < 2 or sum(1 for c in capacity if c) < 2:
+            return day_movable
+        point_coords = coords[points]
+        assignment = np.repeat(np.arange(len(day_movable)), capacity)
+        for _ in range(CLUSTER_ITERATIONS):
+            centroids = np.empty((len(day_movable), 2))
+            for d in range(len(day_movable)):
+                members = [points[k] for k in np.flatnonzero(assignment == d)] + day_anchors[d]
+                centroids[d] = coords[members].mean(axis=0) if members else point_coords.mean(axis=0)
+            updated = self._balanced_assign(point_coords, centroids, capacity)
+            if np.array_equal(updated, assignment):
+                break
+            assignment = updated
+        return [[points[k] for k in np.flatnonzero(assignment == d)] for d in range(len(day_movable))]
+
+    def optimize(self, itinerary: dict, destination: str = None, cluster_days: bool = True) -> dict:
+        """
+        Reorders itinerary["days"][*]["activities"] in place and returns a summary with the
+        total travel distance before and after.
+        """
+        days = [d for d in itinerary.get("days", []) if isinstance(d, dict) and isinstance(d.get("activities"), list)]
+        city_id = destination_index.city_id(destination) if destination else None
+
+        activities, coords = [], []
+        day_slots = []
+        for day in days:
+            slots = []
+            for activity in day["activities"]:
+                point = -1
+                location = self.locate(activity, city_id) if isinstance(activity, dict) else None
+                if location is not None:
+                    point = len(coords)
+                    coords.append(location)
+                    activities.append(activity)
+                slots.append(point)
+            day_slots.append(slots)
+
+        summary = {"activities": sum(len(s) for s in day_slots), "located": len(coords),
+                   "distance_km_before": 0.0, "distance_km_after": 0.0}
+        if len(coords) < 2:
+            return summary
+
+        coords = np.asarray(coords, dtype=float)
+        dist = haversine_matrix(coords)
+        before = sum(self._path_cost(s, dist) for s in day_slots)
+
+        # Split each day into fixed skeleton, points that may change day, and points that may
+        # only be reordered within their day (a day's opening and closing activities)
+        skeletons, day_movable, day_local, day_anchors = [], [], [], []
+        for day, slots in zip(days, day_slots):
+            skeleton, movable, local, anchors = [], [], [], []
+            last = len(slots) - 1
+            for i, (activity, point) in enumerate(zip(day["activities"], slots)):
+                fixed = point < 0 or not isinstance(activity, dict) or activity.get("type") in FIXED_TYPES
+                skeleton.append(point if fixed else None)
+                if fixed and point >= 0:
+                    anchors.append(point)
+                elif not fixed:
+                    (local if i in (0, last) else movable).append(point)
+            skeletons.append(skeleton)
+            day_movable.append(movable)
+            day_local.append(local)
+            day_anchors.append(anchors)
+
+        def solve(groups):
+            paths = [self._order_day(sk, g + local, dist) for sk, g, local in zip(skeletons, groups, day_local)]
+            return paths, sum(self._path_cost(p, dist) for p in paths)
+
+        paths, after = solve(day_movable)
+        if cluster_days and len(days) > 1:
+            anchors = [a + local for a, local in zip(day_anchors, day_local)]
+            clustered_paths, clustered_after = solve(self._cluster_days(day_movable, anchors, coords))
+            if clustered_after < after:
+                paths, after = clustered_paths, clustered_after
+
+        if after < before:
+            for day, slots, path in zip(days, day_slots, paths):
+                original = day["activities"]
+                reordered = []
+                for i, (slot, point) in enumerate(zip(slots, path)):
+                    if slot == point:
+                        reordered.append(original[i])
+                        continue
+                    moved = dict(activities[point])
+                    # Times belong to the slot, not to the activity
+                    if isinstance(original[i], dict) and "time" in original[i]:
+                        moved["time"] = original[i]["time"]
+                    reordered.append(moved)
+                day["activities"] = reordered
+        else:
+            after = before
+
+        summary["distance_km_before"] = round(before, 2)
+        summary["distance_km_after"] = round(after, 2)
+        return summary
+
+route_optimizer = RouteOptimizer()
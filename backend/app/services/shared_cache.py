@@ -0,0 +1,270 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# CACHE_BACKEND=memory (default) keeps results per process; sqlite shares them between every
+# worker on the host through one WAL file, read through a memory map.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+CACHE_DB = os.getenv("CACHE_DB", "./travelmind_cache.db")
+
+# A computation holding a lease longer than this is assumed dead and may be retried elsewhere
+LEASE_SECONDS = 60.0
+POLL_INTERVAL = 0.02
+MAX_POLL_INTERVAL = 0.2
+
+class MemoryBackend:
+    """Per-process entries and leases."""
+    def __init__(self, max_items: int = 50_000):
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._items = {}
+        self._leases = {}
+
+    def get(self, key: str, now: float):
+        item = self._items.get(key)
+        if item is None or item[0] <= now:
+            return None
+        return item[1]
+
+    def set(self, key: str, value, expires: float, now: float):
+        with self._lock:
+            if len(self._items) >= self.max_items and key not in self._items:
+                self._items = {k: v for k, v in self._items.items() if v[0] > now}
+                if len(self._items) >= self.max_items:
+                    self._items.clear()
+            self._items[key] = (expires, value)
+
+    def try_lease(self, key: str, owner: str, now: float, seconds: float) -> bool:
+        with self._lock:
+            lease = self._leases.get(key)
+            if lease is not None and lease[1] > now:
+                return False
+            self._leases[key] = (owner, now + seconds)
+            return True
+
+    def release(self, key: str, owner: str):
+        with self._lock:
+            if self._leases.get(key, (None,))[0] == owner:
+                del self._leases[key]
+
+class SQLiteBackend:
+    """
+    Entries and leases shared by every worker on the host. WAL lets readers proceed while a
+    worker writes, and mmap serves reads from the page cache without read() syscalls.
+    Calls run on the event loop, so a write that can't get the lock within BUSY_TIMEOUT gives
+    up: reads miss, writes are dropped and a lease is treated as granted.
+    """
+    PRUNE_EVERY = 1000
+    MMAP_SIZE = 256 * 1024 * 1024
+    BUSY_TIMEOUT = 0.05
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._sets = 0
+        self.busy = 0
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL) WITHOUT ROWID")
+        conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL) WITHOUT ROWID")
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={self.MMAP_SIZE}")
+            # Setup above may wait on other workers starting; cache calls afterwards may not
+            conn.execute(f"PRAGMA busy_timeout={int(self.BUSY_TIMEOUT * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    def _busy(self, e: sqlite3.OperationalError):
+        self.busy += 1
+        if self.busy % 100 == 1:
+            print(f"Shared cache busy ({self.busy} so far): {e}")
+
+    def get(self, key: str, now: float):
+        try:
+            row = self._connect().execute("SELECT value FROM cache WHERE key = ? AND expires > ?", (key, now)).fetchone()
+        except sqlite3.OperationalError as e:
+            self._busy(e)
+            return None
+        return None if row is None else json.loads(row[0])
+
+    def set(self, key: str, value, expires: float, now: float):
+        conn = self._connect()
+        try:
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                         (key, json.dumps(value, separators=(",", ":")), expires))
+            self._sets += 1
+            if self._sets % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM cache WHERE expires <= ?", (now,))
+                conn.execute("DELETE FROM leases WHERE expires <= ?", (now,))
+        except sqlite3.OperationalError as e:
+            self._busy(e)
+
+    def try_lease(self, key: str, owner: str, now: float, seconds: float) -> bool:
+        # One statement, so it is atomic across processes without an explicit transaction
+        try:
+            cursor = self._connect().execute(
+                "INSERT INTO leases (key, owner, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+                "WHERE leases.expires <= ?",
+                (key, owner, now + seconds, now),
+            )
+        except sqlite3.OperationalError as e:
+            # Compute without the lease: a duplicate upstream call beats waiting on the lock
+            self._busy(e)
+            return True
+        return cursor.rowcount == 1
+
+    def release(self, key: str, owner: str):
+        try:
+            self._connect().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+        except sqlite3.OperationalError as e:
+            # The lease lapses on its own after LEASE_SECONDS
+            self._busy(e)
+
+class ResponseCache:
+    """
+    Namespaced result cache with single-flight: concurrent requests for the same missing key
+    share one computation, within a worker through a future and across workers through a lease.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._inflight = {}
+        self._stats = {}
+
+    def _count(self, namespace: str, field: str):
+        stats = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "waits": 0})
+        stats[field] += 1
+
+    def get(self, namespace: str, key: str, count_miss: bool = True):
+        value = self.backend.get(f"{namespace}:{key}", time.time())
+        if value is not None or count_miss:
+            self._count(namespace, "hits" if value is not None else "misses")
+        return value
+
+    def set(self, namespace: str, key: str, value, ttl: float):
+        now = time.time()
+        self.backend.set(f"{namespace}:{key}", value, now + ttl, now)
+
+    async def get_or_compute(self, namespace: str, key: str, ttl: float, compute, cacheable=None):
+        """Cached value, or the result of `await compute()` stored when cacheable(value) allows."""
+        full_key = f"{namespace}:{key}"
+        value = self.backend.get(full_key, time.time())
+        if value is not None:
+            self._count(namespace, "hits")
+            return value
+        pending = self._inflight.get(full_key)
+        if pending is not None:
+            self._count(namespace, "waits")
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            value = await self._compute_once(namespace, full_key, ttl, compute, cacheable)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here so an unawaited future doesn't log a warning
+            raise
+        finally:
+            del self._inflight[full_key]
+
+    async def _compute_once(self, namespace, full_key, ttl, compute, cacheable):
+        delay = POLL_INTERVAL
+        while True:
+            now = time.time()
+            if self.backend.try_lease(full_key, self.owner, now, LEASE_SECONDS):
+                try:
+                    # Another worker may have stored it between our miss and the lease
+                    value = self.backend.get(full_key, now)
+                    if value is not None:
+                        self._count(namespace, "waits")
+                        return value
+                    self._count(namespace, "misses")
+                    value = await compute()
+                    if value is not None and (cacheable is None or cacheable(value)):
+                        stored = time.time()
+                        self.backend.set(full_key, value, stored + ttl, stored)
+                    return value
+                finally:
+                    self.backend.release(full_key, self.owner)
+            # Another worker holds the lease; wait for its result or for the lease to lapse
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_POLL_INTERVAL)
+            value = self.backend.get(full_key, time.time())
+            if value is not None:
+                self._count(namespace, "waits")
+                return value
+
+    def get_or_compute_sync(self, namespace: str, key: str, ttl: float, compute, cacheable=None):
+        """Blocking variant for code that runs in the threadpool."""
+        full_key = f"{namespace}:{key}"
+        delay = POLL_INTERVAL
+        while True:
+            now = time.time()
+            value = self.backend.get(full_key, now)
+            if value is not None:
+                self._count(namespace, "hits")
+                return value
+            if self.backend.try_lease(full_key, self.owner, now, LEASE_SECONDS):
+                try:
+                    self._count(namespace, "misses")
+                    value = compute()
+                    if value is not None and (cacheable is None or cacheable(value)):
+                        stored = time.time()
+                        self.backend.set(full_key, value, stored + ttl, stored)
+                    return value
+                finally:
+                    self.backend.release(full_key, self.owner)
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_POLL_INTERVAL)
+
+    def namespace(self, name: str, ttl: float) -> "CacheNamespace":
+        return CacheNamespace(self, name, ttl)
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "busy": getattr(self.backend, "busy", 0),
+            "worker": os.getpid(),
+            "namespaces": {name: dict(stats) for name, stats in sorted(self._stats.items())},
+        }
+
+class CacheNamespace:
+    """get/set bound to one namespace and TTL."""
+    def __init__(self, cache: ResponseCache, name: str, ttl: float):
+        self.cache = cache
+        self.name = name
+        self.ttl = ttl
+
+    def get(self, key: str):
+        return self.cache.get(self.name, key)
+
+    def set(self, key: str, value):
+        self.cache.set(self.name, key, value, self.ttl)
+
+    def get_or_compute(self, key: str, compute, cacheable=None):
+        return self.cache.get_or_compute_sync(self.name, key, self.ttl, compute, cacheable)
+
+def _make_backend():
+    if CACHE_BACKEND == "sqlite":
+        return SQLiteBackend(CACHE_DB)
+    return MemoryBackend()
+
+response_cache = ResponseCache(_make_backend())
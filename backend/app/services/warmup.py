@@ -0,0 +1,39 @@
+import asyncio
+import os
+import time
+from app.supabase_client import warm_up_auth
+from app.services.ai_service import ai_service
+from app.services.cost_engine import cost_engine
+from app.services.crowd_forecast import crowd_forecaster
+from app.services.destination_index import destination_index
+from app.services.image_service import get_ddgs
+from app.services.prompt_registry import count_tokens
+
+# Network warm-up is best effort and must not hold up a worker for long
+WARM_UP_TIMEOUT = 3.0
+
+async def _warm_up_groq():
+    if ai_service.client is not None:
+        await ai_service.client.models.list()
+
+async def warm_up():
+    """
+    Loads local data and opens pooled upstream connections in this worker, so the first
+    requests after a (re)start don't pay for them.
+    """
+    start = time.perf_counter()
+    destination_index.resolve("warm up")
+    crowd_forecaster.store
+    crowd_forecaster.events
+    cost_engine.rates
+    count_tokens("warm up")
+    get_ddgs()
+
+    results = await asyncio.gather(
+        *(asyncio.wait_for(task(), WARM_UP_TIMEOUT) for task in (warm_up_auth, _warm_up_groq)),
+        return_exceptions=True,
+    )
+    for name, result in zip(("auth", "groq"), results):
+        if isinstance(result, BaseException):
+            print(f"Warm-up of {name} connection skipped: {result!r}")
+    print(f"Worker {os.getpid()} warmed up in {1000 * (time.perf_counter() - start):.0f} ms")
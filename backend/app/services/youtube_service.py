@@ -1,47 +1,146 @@
 import os
+import re
+import threading
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from app.services.shared_cache import response_cache
+
+# YouTube Data API quota cost per call
+SEARCH_COST = 100
+VIDEOS_LIST_COST = 1
+VIDEOS_LIST_BATCH = 50
+
+QUERY_TTL = 6 * 3600
+VIDEO_TTL = 24 * 3600
+
+_DURATION_RE = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+
+def parse_duration(value: str) -> int:
+    """ISO 8601 duration ("PT1H2M10S") to seconds."""
+    match = _DURATION_RE.fullmatch(value or "")
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
 
 class YouTubeService:
-    def __init__(self):
+    def __init__(self, youtube=None, cache=response_cache):
         self.api_key = os.getenv("YOUTUBE_API_KEY")
-        self.youtube = None
-        if self.api_key:
+        self._client = youtube
+        self._local = threading.local()
+        # Query pages hold only ids; per-video metadata is cached once and shared across queries
+        self.query_cache = cache.namespace("youtube.search", QUERY_TTL)
+        self.video_cache = cache.namespace("youtube.video", VIDEO_TTL)
+        self._quota_lock = threading.Lock()
+        self.quota_used = 0
+
+    @property
+    def youtube(self):
+        """
+        The API client for the calling thread. Routes call this service from the threadpool and
+        googleapiclient's httplib2 transport isn't thread-safe, so each thread builds its own.
+        """
+        if self._client is not None:
+            return self._client
+        client = getattr(self._local, "client", None)
+        if client is None and self.api_key:
             try:
-                self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+                client = self._local.client = build('youtube', 'v3', developerKey=self.api_key, cache_discovery=False)
             except Exception as e:
                 print(f"Failed to initialize YouTube API: {e}")
+        return client
 
-    def search_videos(self, query: str, max_results: int = 6):
-        if not self.youtube:
-            return {"error": "YouTube API not configured"}
+    def _charge(self, units: int):
+        with self._quota_lock:
+            self.quota_used += units
 
-        try:
-            # Search for videos matching the query
-            search_response = self.youtube.search().list(
-                q=query,
-                part='id,snippet',
-                maxResults=max_results,
-                type='video',
-                videoDefinition='high',
-                relevanceLanguage='en'
-            ).execute()
+    def _search_page(self, query: str, max_results: int, page_token: str = None) -> dict:
+        # search.list costs 100 units, so concurrent identical searches in any worker share one call
+        key = f"{query.strip().lower()}|{max_results}|{page_token or ''}"
+        return self.query_cache.get_or_compute(key, lambda: self._fetch_search_page(query, max_results, page_token))
+
+    def _fetch_search_page(self, query: str, max_results: int, page_token: str = None) -> dict:
+        params = dict(
+            q=query,
+            part='id,snippet',
+            maxResults=max_results,
+            type='video',
+            videoDefinition='high',
+            relevanceLanguage='en'
+        )
+        if page_token:
+            params["pageToken"] = page_token
+        search_response = self.youtube.search().list(**params).execute()
+        self._charge(SEARCH_COST)
 
-            videos = []
-            for item in search_response.get('items', []):
-                videos.append({
-                    "id": item['id']['videoId'],
+        ids = []
+        for item in search_response.get('items', []):
+            video_id = item['id']['videoId']
+            ids.append(video_id)
+            if self.video_cache.get(video_id) is None:
+                # Snippet now; contentDetails/statistics are filled in by _enrich
+                self.video_cache.set(video_id, {
+                    "id": video_id,
                     "title": item['snippet']['title'],
                     "description": item['snippet']['description'],
                     "thumbnail": item['snippet']['thumbnails']['high']['url'],
                     "channel": item['snippet']['channelTitle'],
-                    "publishTime": item['snippet']['publishTime']
+                    "publishTime": item['snippet']['publishTime'],
                 })
-            
-            return videos
+        return {"ids": ids, "next_page_token": search_response.get('nextPageToken')}
 
+    def _enrich(self, ids: list):
+        """Fetches duration and statistics for cached videos that lack them, 50 ids per call."""
+        missing = [i for i in ids if (v := self.video_cache.get(i)) is not None and "duration_seconds" not in v]
+        youtube = self.youtube
+        for start in range(0, len(missing), VIDEOS_LIST_BATCH):
+            batch = missing[start:start + VIDEOS_LIST_BATCH]
+            response = youtube.videos().list(
+                part='contentDetails,statistics',
+                id=','.join(batch),
+                maxResults=len(batch)
+            ).execute()
+            self._charge(VIDEOS_LIST_COST)
+            for item in response.get('items', []):
+                video = self.video_cache.get(item['id'])
+                if video is None:
+                    continue
+                stats = item.get('statistics', {})
+                self.video_cache.set(item['id'], {
+                    **video,
+                    "duration_seconds": parse_duration(item.get('contentDetails', {}).get('duration')),
+                    "view_count": int(stats.get('viewCount', 0)),
+                    "like_count": int(stats.get('likeCount', 0)),
+                })
+
+    def search_page(self, query: str, max_results: int = 6, page_token: str = None) -> dict:
+        """
+        One page of enriched results: {"videos": [...], "next_page_token": str | None}.
+        Pass next_page_token back to continue the same search.
+        """
+        if not self.youtube:
+            return {"error": "YouTube API not configured"}
+
+        try:
+            page = self._search_page(query, max_results, page_token)
+            self._enrich(page["ids"])
+            videos = [v for v in (self.video_cache.get(i) for i in page["ids"]) if v is not None]
+            return {"videos": videos, "next_page_token": page["next_page_token"]}
         except HttpError as e:
             print(f"YouTube API Error: {e}")
             return {"error": str(e)}
 
+    def stream_pages(self, query: str, max_results: int = 6, page_token: str = None, max_pages: int = 5):
+        """Yields successive pages until results run out, an error occurs or max_pages is reached."""
+        for _ in range(max_pages):
+            page = self.search_page(query, max_results, page_token)
+            yield page
+            page_token = page.get("next_page_token")
+            if "error" in page or not page_token:
+                return
+
+    def search_videos(self, query: str, max_results: int = 6):
+        page = self.search_page(query, max_results)
+        return page if "error" in page else page["videos"]
+
 youtube_service = YouTubeService()
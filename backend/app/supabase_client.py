@@ -1,4 +1,7 @@
+import asyncio
+import httpx
 from supabase import create_client, Client
+from supabase_auth import AsyncGoTrueClient
 import os
 from dotenv import load_dotenv
 
@@ -8,6 +11,13 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 
+# Auth call limits. Sign-in/sign-up and token verification get separate caps so a
+# login storm cannot starve the token checks that every /api/ai request waits on.
+AUTH_TIMEOUT = float(os.getenv("SUPABASE_AUTH_TIMEOUT", "5"))
+AUTH_QUEUE_TIMEOUT = float(os.getenv("SUPABASE_AUTH_QUEUE_TIMEOUT", "2"))
+AUTH_MAX_LOGINS = int(os.getenv("SUPABASE_AUTH_MAX_LOGINS", "8"))
+AUTH_MAX_VERIFICATIONS = int(os.getenv("SUPABASE_AUTH_MAX_VERIFICATIONS", "32"))
+
 # Initialize Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
 
@@ -16,3 +26,62 @@ def get_supabase_client() -> Client:
     if not supabase:
         raise Exception("Supabase client not initialized. Check your environment variables.")
     return supabase
+
+class AuthUnavailable(Exception):
+    """Auth backend is saturated or timed out; the caller should retry later."""
+
+class AuthGate:
+    """Caps concurrent auth calls of one kind and bounds how long each may wait and run."""
+    def __init__(self, name: str, concurrency: int):
+        self.name = name
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def run(self, coro):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), AUTH_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            coro.close()
+            raise AuthUnavailable(f"Too many concurrent {self.name} requests")
+        try:
+            return await asyncio.wait_for(coro, AUTH_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise AuthUnavailable(f"Auth {self.name} timed out")
+        finally:
+            self._slots.release()
+
+login_gate = AuthGate("login", AUTH_MAX_LOGINS)
+verify_gate = AuthGate("verification", AUTH_MAX_VERIFICATIONS)
+
+_async_auth: AsyncGoTrueClient = None
+_auth_http: httpx.AsyncClient = None
+
+def get_async_auth_client() -> AsyncGoTrueClient:
+    """
+    Async GoTrue client for server-side auth calls, sharing one pooled HTTP connection set.
+    Sessions are not persisted: handlers only read the tokens each call returns.
+    """
+    global _async_auth, _auth_http
+    if _async_auth is None:
+        if not (SUPABASE_URL and SUPABASE_KEY):
+            raise Exception("Supabase client not initialized. Check your environment variables.")
+        pool = AUTH_MAX_LOGINS + AUTH_MAX_VERIFICATIONS
+        _auth_http = httpx.AsyncClient(
+            timeout=AUTH_TIMEOUT,
+            limits=httpx.Limits(max_connections=pool, max_keepalive_connections=pool),
+            follow_redirects=True,
+        )
+        _async_auth = AsyncGoTrueClient(
+            url=f"{SUPABASE_URL}/auth/v1",
+            headers={"apikey": SUPABASE_KEY, "Authorization": f"Bearer {SUPABASE_KEY}"},
+            auto_refresh_token=False,
+            persist_session=False,
+            http_client=_auth_http,
+        )
+    return _async_auth
+
+async def warm_up_auth():
+    """Creates this worker's auth client and opens a pooled connection before the first request."""
+    if not (SUPABASE_URL and SUPABASE_KEY):
+        return
+    get_async_auth_client()
+    await _auth_http.get(f"{SUPABASE_URL}/auth/v1/health", headers={"apikey": SUPABASE_KEY})
@@ -0,0 +1,164 @@
+"""
+Mixed-load benchmark: AI-route latency while a login storm hits /api/auth/login.
+
+A local GoTrue stand-in (uvicorn, real HTTP) answers /token after 150 ms (password hashing)
+and /user after 5 ms. The AI upstream is stubbed at 50 ms. The current app is compared with
+the previous handlers, which called the synchronous GoTrue client inside async routes.
+
+    python bench_auth.py
+"""
+import asyncio
+import os
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+
+LOGIN_DELAY = 0.15
+VERIFY_DELAY = 0.005
+AI_DELAY = 0.05
+LOGINS = 200
+AI_CALLS = 100
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+USER = {
+    "id": "00000000-0000-0000-0000-000000000001", "aud": "authenticated", "role": "authenticated",
+    "email": "bench@example.com", "app_metadata": {}, "user_metadata": {"full_name": "Bench"},
+    "created_at": "2026-01-01T00:00:00Z",
+}
+
+gotrue = FastAPI()
+
+@gotrue.post("/auth/v1/token")
+async def token():
+    await asyncio.sleep(LOGIN_DELAY)
+    return {"access_token": "token", "token_type": "bearer", "expires_in": 3600,
+            "expires_at": int(time.time()) + 3600, "refresh_token": "refresh", "user": USER}
+
+@gotrue.get("/auth/v1/user")
+async def user():
+    await asyncio.sleep(VERIFY_DELAY)
+    return JSONResponse(USER)
+
+def start_gotrue(port: int):
+    server = uvicorn.Server(uvicorn.Config(gotrue, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+class StubCompletions:
+    async def create(self, messages, model, **kwargs):
+        await asyncio.sleep(AI_DELAY)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+def configure_app():
+    from app.main import app
+    from app.services.ai_service import ai_service
+    from app.services.rate_limiter import RateLimit, rate_limiter
+
+    for scope in list(rate_limiter.limits):
+        rate_limiter.limits[scope] = RateLimit(1_000_000, 60)
+    ai_service.client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions()))
+    ai_service.model = "stand-in"
+    return app
+
+def use_blocking_auth(app: FastAPI, url: str, key: str):
+    """Swaps the previous blocking auth calls back into the app."""
+    from supabase_auth import SyncGoTrueClient
+    from fastapi.routing import APIRoute
+    from app.auth import auth_routes
+    from app.auth.auth_utils import User, get_current_user
+
+    sync_auth = SyncGoTrueClient(url=f"{url}/auth/v1", headers={"apikey": key},
+                                 auto_refresh_token=False, persist_session=False)
+
+    async def blocking_current_user():
+        response = sync_auth.get_user("token")
+        return User(email=response.user.email, full_name="Bench")
+
+    async def blocking_login(user_data: auth_routes.UserLogin):
+        try:
+            response = sync_auth.sign_in_with_password({"email": user_data.email, "password": user_data.password})
+            return {"access_token": response.session.access_token, "token_type": "bearer"}
+        except Exception as e:
+            raise HTTPException(status_code=401, detail=str(e))
+
+    app.router.routes[:] = [r for r in app.router.routes if getattr(r, "path", "") != "/api/auth/login"]
+    app.router.routes.insert(0, APIRoute("/api/auth/login", blocking_login, methods=["POST"]))
+    app.dependency_overrides[get_current_user] = blocking_current_user
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+async def mixed_load(app: FastAPI, logins: int = LOGINS):
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": "Bearer token"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+        async def login():
+            r = await client.post("/api/auth/login", json={"email": "bench@example.com", "password": "pw"})
+            return r.status_code
+
+        async def chat(arrival):
+            r = await client.post("/api/ai/chat", json={"message": "hi"}, headers=headers)
+            # Measured from when the request was due to arrive, so time spent
+            # waiting for a blocked event loop counts as latency
+            return time.perf_counter() - arrival, r.status_code
+
+        async def paced_chats():
+            results = []
+            for i in range(AI_CALLS):
+                arrival = start + i * 0.01
+                await asyncio.sleep(max(0.0, arrival - time.perf_counter()))
+                results.append(asyncio.create_task(chat(arrival)))
+            return await asyncio.gather(*results)
+
+        await chat(time.perf_counter())  # warm connections
+        start = time.perf_counter()
+        logins, chats = await asyncio.gather(
+            asyncio.gather(*(login() for _ in range(logins))), paced_chats()
+        )
+        elapsed = time.perf_counter() - start
+    latencies = [1000 * t for t, status in chats if status == 200]
+    return {
+        "ai_ok": len(latencies),
+        "ai_p50": percentile(latencies, 50) if latencies else float("nan"),
+        "ai_p99": percentile(latencies, 99) if latencies else float("nan"),
+        "logins": {s: logins.count(s) for s in sorted(set(logins))},
+        "wall": elapsed,
+    }
+
+def main():
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    os.environ["SUPABASE_URL"] = url
+    os.environ["SUPABASE_ANON_KEY"] = "bench.anon.key"
+    start_gotrue(port)
+    app = configure_app()
+    from app import supabase_client
+
+    print(f"{LOGINS} concurrent logins ({int(LOGIN_DELAY * 1000)} ms each) + {AI_CALLS} /api/ai/chat calls "
+          f"({int(AI_DELAY * 1000)} ms upstream, one every 10 ms)")
+    print(f"{'handlers':<12}{'ai ok':>7}{'ai p50 ms':>11}{'ai p99 ms':>11}{'wall s':>8}   login statuses")
+    r = asyncio.run(mixed_load(app, logins=0))
+    print(f"{'no storm':<12}{r['ai_ok']:>7}{r['ai_p50']:>11.0f}{r['ai_p99']:>11.0f}{r['wall']:>8.2f}")
+    # The pooled auth client belongs to the event loop that created it
+    supabase_client._async_auth = None
+    r = asyncio.run(mixed_load(app))
+    print(f"{'async':<12}{r['ai_ok']:>7}{r['ai_p50']:>11.0f}{r['ai_p99']:>11.0f}{r['wall']:>8.2f}   {r['logins']}")
+    use_blocking_auth(app, url, "bench.anon.key")
+    r = asyncio.run(mixed_load(app))
+    print(f"{'blocking':<12}{r['ai_ok']:>7}{r['ai_p50']:>11.0f}{r['ai_p99']:>11.0f}{r['wall']:>8.2f}   {r['logins']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Cost engine throughput: parsing free-form cost strings and aggregating whole itineraries
+in large batches. Runs offline.
+
+    python bench_costs.py
+"""
+import random
+import time
+from app.services.cost_engine import cost_engine, parse_cost, _parse_cost_text
+
+TEMPLATES = [
+    "${a}", "Free", "€{a}-{b}", "{k} JPY", "¥{k:,}", "₹{k}", "Rs. {k}", "${a} - ${b} per person",
+    "around {k} rupees", "Included", "{a}.50 EUR", "S${a}", "HK$ {a}–{b}", "{k} baht", "{a} to {b} USD",
+    "£{a}", "₩{k}0", "Varies",
+]
+TYPES = ["food", "transport", "hotel", "activity", "break"]
+
+def cost_string(rng: random.Random) -> str:
+    a = rng.randint(5, 90)
+    return rng.choice(TEMPLATES).format(a=a, b=a + rng.randint(5, 40), k=rng.randint(100, 9000))
+
+def itinerary(rng: random.Random, days: int = 14, per_day: int = 7) -> dict:
+    return {"days": [
+        {"day": d + 1, "activities": [
+            {"title": f"Stop {d}.{i}", "type": rng.choice(TYPES), "cost_estimate": cost_string(rng)}
+            for i in range(per_day)
+        ]} for d in range(days)
+    ]}
+
+def main():
+    rng = random.Random(11)
+    cost_engine.rates  # load the rate table outside the timed region
+
+    strings = [cost_string(rng) for _ in range(200_000)]
+    _parse_cost_text.cache_clear()
+    start = time.perf_counter()
+    for s in strings:
+        _parse_cost_text.__wrapped__(s)
+    uncached = len(strings) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for s in strings:
+        parse_cost(s)
+    warm = time.perf_counter()
+    for s in strings:
+        parse_cost(s)
+    cached = len(strings) / (time.perf_counter() - warm)
+    print(f"parse uncached       {uncached:>12,.0f} strings/s")
+    print(f"parse cached         {cached:>12,.0f} strings/s  ({_parse_cost_text.cache_info().currsize:,} distinct strings)")
+
+    batch = [itinerary(rng) for _ in range(1000)]
+    activities = sum(len(d["activities"]) for it in batch for d in it["days"])
+    _parse_cost_text.cache_clear()
+    start = time.perf_counter()
+    results = [cost_engine.breakdown(it, "INR") for it in batch]
+    elapsed = time.perf_counter() - start
+    print(f"breakdown            {len(batch) / elapsed:>12,.0f} itineraries/s  "
+          f"({activities / elapsed:,.0f} activities/s, {1000 * elapsed / len(batch):.2f} ms per 14-day trip)")
+
+    sample = results[0]
+    print(f"\nsample trip: total {sample['total']['mid']:,.0f} {sample['currency']}, split {sample['split']}, "
+          f"{sample['parsed']} parsed / {sample['unparsed']} unparsed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Crowd insight latency with the local forecast engine, and raw forecast throughput.
+
+The AI upstream is stubbed at 1.5 s, roughly what the previous all-LLM crowd insight took;
+here it only writes the advice text in the background, except for destinations without
+profiled spots, which it forecasts once to seed the store.
+
+    python bench_crowd.py
+"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+
+AI_DELAY = 1.5
+REQUESTS = 2000
+DESTINATIONS = ["Kyoto", "Paris", "Rome", "Tokyo", "Barcelona", "Goa", "New York", "Munich", "Edinburgh", "Bali"]
+
+CROWD_REPORT = json.dumps({
+    "hourly_forecast": [{"time": t, "density": d} for t, d in
+                        zip(("8AM", "10AM", "12PM", "2PM", "4PM", "6PM", "8PM"), (25, 45, 70, 85, 75, 60, 40))],
+    "major_spots": [{"name": "Old Town", "status": "High", "density": 85, "wait_time": 20},
+                    {"name": "Main Market", "status": "Moderate", "density": 65, "wait_time": 10},
+                    {"name": "Cathedral", "status": "Moderate", "density": 55, "wait_time": 5}],
+    "advice": "Arrive before 9AM and leave the headline sights for late afternoon.",
+})
+
+class StubCompletions:
+    async def create(self, messages, model, **kwargs):
+        await asyncio.sleep(AI_DELAY)
+        json_mode = kwargs.get("response_format", {}).get("type") == "json_object"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(
+            content=CROWD_REPORT if json_mode else "Arrive before 9AM and leave the headline sights for late afternoon."))])
+
+class StubAuth:
+    async def get_user(self, token):
+        return SimpleNamespace(user=SimpleNamespace(email="bench@example.com", user_metadata={"full_name": "Bench"}))
+
+from app.services.crowd_forecast import crowd_forecaster
+
+def configure_app():
+    from app.main import app
+    from app.auth import auth_utils
+    from app.services.ai_service import ai_service
+    from app.services.rate_limiter import RateLimit, rate_limiter
+
+    for scope in list(rate_limiter.limits):
+        rate_limiter.limits[scope] = RateLimit(1_000_000, 60)
+    ai_service.client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions()))
+    ai_service.model = "stand-in"
+    auth_utils.get_async_auth_client = lambda: StubAuth()
+    return app
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+async def endpoint(app):
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": "Bearer token"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def insight(destination, day):
+            start = time.perf_counter()
+            r = await client.post("/api/ai/insight", headers=headers,
+                                  json={"destination": destination, "category": "crowd", "date": day})
+            return time.perf_counter() - start, r.json()["insight"]
+
+        cold, first = await insight("Kyoto", "2026-04-04")
+        # Destinations without profiled spots go to the model once, then are forecast locally
+        fallback = [(await insight(d, "2026-04-04"))[0] for d in DESTINATIONS if not crowd_forecaster.knows(d)]
+        timings = []
+        for i in range(REQUESTS):
+            day = str(np.datetime64("2026-01-01") + i % 365)
+            elapsed, _ = await insight(DESTINATIONS[i % len(DESTINATIONS)], day)
+            timings.append(elapsed)
+        await asyncio.sleep(AI_DELAY + 0.2)
+        _, again = await insight("Kyoto", "2026-04-04")
+    return cold, fallback, timings, first, again
+
+def main():
+    app = configure_app()
+
+    cold, fallback, timings, first, again = asyncio.run(endpoint(app))
+    ms = [1000 * t for t in timings]
+    print(f"POST /api/ai/insight category=crowd, {REQUESTS} requests over 10 destinations x 365 dates")
+    print(f"  first request (loads store)  {1000 * cold:8.1f} ms")
+    print(f"  unprofiled destination, once {1000 * np.mean(fallback):8.1f} ms  ({len(fallback)} of {len(DESTINATIONS)}, seeded by the model)")
+    print(f"  p50 / p99                    {percentile(ms, 50):8.2f} / {percentile(ms, 99):.2f} ms")
+    print(f"  previous all-LLM insight     {1000 * AI_DELAY:8.0f} ms + JSON parsing, per request")
+    print(f"  advice: first call '{first['advice_source']}', after the background call '{again['advice_source']}'")
+
+    store = crowd_forecaster.store
+    print(f"  store rows after the run     {len(store.ids):8d}  ({store.base_rows} from the gazetteer)")
+    rows = np.arange(len(store.ids))
+    dates = np.arange(np.datetime64("2026-01-01"), np.datetime64("2027-01-01"))
+    start = time.perf_counter()
+    grid = crowd_forecaster.densities(rows, dates)
+    elapsed = time.perf_counter() - start
+    print(f"\nfull-year grid: {len(rows)} places x {len(dates)} days x 24 h = {grid.size:,} cells in {1000 * elapsed:.1f} ms")
+    print(f"profile store: {store.hourly.nbytes + store.monthly.nbytes:,} bytes for {len(rows)} places")
+
+if __name__ == "__main__":
+    main()
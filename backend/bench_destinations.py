@@ -0,0 +1,58 @@
+"""
+Measures destination canonicalization: index build time, memory held by the index,
+and uncached resolve/suggest latency for spelling variants. Runs offline.
+
+    python bench_destinations.py
+"""
+import sys
+import time
+import tracemalloc
+from app.services.gazetteer import Gazetteer
+from app.services.destination_index import DestinationIndex
+
+VARIANTS = [
+    "kyoto", "Kyoto, Japan", "Kyōto", "KYOTO ", "kyotto", "京都",
+    "new york city", "NYC", "barcelna", "Zürich", "Paris France", "Eiffel Tower", "Atlantis",
+    "Montreal", "Udaipur", "Venice Beach", "Paris, Texas",
+]
+PREFIXES = ["k", "ky", "par", "bar", "new y", "sing", "rom", "barcelna"]
+
+def per_call_us(fn, args, repeats=200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for a in args:
+            fn(a)
+    return (time.perf_counter() - start) / (repeats * len(args)) * 1e6
+
+def main():
+    tracemalloc.start()
+    start = time.perf_counter()
+    source = Gazetteer()
+    source.places
+    loaded = time.perf_counter()
+    index = DestinationIndex(source)
+    index._ensure_loaded()
+    built = time.perf_counter()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    arrays = (sys.getsizeof(index._blob) + sys.getsizeof(index._offsets)
+              + sys.getsizeof(index._key_place) + sys.getsizeof(index._key_grams)
+              + sum(sys.getsizeof(p) for p in index._postings.values()))
+    print(f"gazetteer load      {1000 * (loaded - start):8.2f} ms")
+    print(f"index build         {1000 * (built - loaded):8.2f} ms  ({len(index._key_place)} names, {len(index._postings)} trigrams)")
+    print(f"memory (all)        {current / 1024:8.1f} KiB  (index arrays {arrays / 1024:.1f} KiB)")
+
+    uncached = per_call_us(DestinationIndex.resolve.__wrapped__.__get__(index), VARIANTS)
+    cached = per_call_us(index.resolve, VARIANTS)
+    suggest = per_call_us(index.suggest, PREFIXES)
+    print(f"resolve uncached    {uncached:8.1f} us/call")
+    print(f"resolve cached      {cached:8.2f} us/call")
+    print(f"suggest             {suggest:8.1f} us/call")
+    print()
+    for text in VARIANTS:
+        match = index.resolve(text)
+        print(f"  {text!r:<18} -> {match['id'] if match else None} ({match['match'] if match else '-'})")
+
+if __name__ == "__main__":
+    main()
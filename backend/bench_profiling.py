@@ -0,0 +1,112 @@
+"""
+Overhead of the opt-in request profiler on /api/ai/plan, and a sample of what it records.
+
+The AI upstream and Supabase /user are stubbed with asyncio.sleep (0 ms by default so that
+only our own code is measured). Compares the app without the middleware (profiling off),
+with it installed but the request not selected, and with every request profiled.
+
+    python bench_profiling.py
+"""
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+os.environ["PROFILE_TOKEN"] = "bench-token"
+
+import httpx
+
+REQUESTS = 1500
+AI_DELAY = 0.0
+AUTH_DELAY = 0.0
+
+ITINERARY = json.dumps({
+    "trip_summary": {"title": "Kyoto", "description": "Temples", "estimated_total_cost": "₹90000"},
+    "days": [{"day": d + 1, "theme": "Temples", "activities": [
+        {"time": "09:00 AM", "title": title, "type": kind, "location": title, "cost_estimate": cost}
+        for title, kind, cost in [
+            ("Fushimi Inari Shrine", "activity", "Free"), ("Nishiki Market", "food", "¥1500"),
+            ("Kinkaku-ji", "activity", "¥500"), ("Gion", "activity", "Free"), ("Ryokan", "hotel", "$120"),
+        ]]} for d in range(5)],
+})
+
+PLAN = {
+    "destination": "Kyoto", "dates": "2026-04-01 to 2026-04-05", "duration_days": 5, "budget": "₹90000",
+    "group_size": 2, "preferences": {"pace": "Moderate", "travel_style": ["History", "Foodie"]},
+}
+
+class StubCompletions:
+    async def create(self, messages, model, **kwargs):
+        await asyncio.sleep(AI_DELAY)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=ITINERARY))])
+
+class StubAuth:
+    async def get_user(self, token):
+        await asyncio.sleep(AUTH_DELAY)
+        return SimpleNamespace(user=SimpleNamespace(email="bench@example.com", user_metadata={"full_name": "Bench"}))
+
+def configure_app():
+    from app.main import app
+    from app.auth import auth_utils
+    from app.services.ai_service import ai_service
+    from app.services.rate_limiter import RateLimit, rate_limiter
+
+    for scope in list(rate_limiter.limits):
+        rate_limiter.limits[scope] = RateLimit(1_000_000, 60)
+    ai_service.client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions()))
+    ai_service.model = "stand-in"
+    auth_utils.get_async_auth_client = lambda: StubAuth()
+    return app
+
+def without_profiling(app):
+    from app.api.profile_routes import ProfilingMiddleware
+    app.user_middleware = [m for m in app.user_middleware if m.cls is not ProfilingMiddleware]
+    app.middleware_stack = None
+
+async def run(app, headers: dict, n: int = REQUESTS) -> list:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(50):
+            await client.post("/api/ai/plan", json=PLAN, headers=headers)
+        timings = []
+        for _ in range(n):
+            start = time.perf_counter()
+            r = await client.post("/api/ai/plan", json=PLAN, headers=headers)
+            timings.append(time.perf_counter() - start)
+            assert r.status_code == 200, r.text
+    return sorted(timings)
+
+def span_cost(n: int = 1_000_000) -> float:
+    from app.services.profiler import profiler
+    start = time.perf_counter()
+    for _ in range(n):
+        with profiler.span("x"):
+            pass
+    return 1e9 * (time.perf_counter() - start) / n
+
+def main():
+    app = configure_app()
+    from app.services.profiler import profiler
+
+    auth = {"Authorization": "Bearer token"}
+    profiled = {**auth, "X-Profile-Token": "bench-token"}
+    print(f"/api/ai/plan, {REQUESTS} sequential requests in-process (upstream and auth stubbed at 0 ms)")
+    print(f"{'mode':<30}{'p50 ms':>9}{'p99 ms':>9}{'req/s':>9}")
+    results = {}
+    for label, headers in [("installed, not selected", auth), ("profiled (header)", profiled)]:
+        results[label] = asyncio.run(run(app, headers))
+    captured = profiler.recent()
+    without_profiling(app)
+    results = {"profiling off (no middleware)": asyncio.run(run(app, auth)), **results}
+    for label, t in results.items():
+        print(f"{label:<30}{1000 * t[len(t) // 2]:>9.3f}{1000 * t[int(len(t) * 0.99)]:>9.3f}{len(t) / sum(t):>9.0f}")
+
+    print(f"\nspan() with no active profile: {span_cost():.0f} ns per call")
+    print(f"ring buffer: {len(captured)} of {profiler.profiles.maxlen} kept")
+    print("\nlast profile:", json.dumps(captured[-1].to_dict()["stages"]))
+    print("\nfolded stacks over the buffer (us):")
+    print(profiler.folded(captured), end="")
+
+if __name__ == "__main__":
+    main()
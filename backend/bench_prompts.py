@@ -0,0 +1,233 @@
+"""
+Compares the legacy inline f-string prompts with the compiled prompt registry.
+Reports prompt tokens, tokens left after a provider prefix-cache hit, and
+local build latency per endpoint. Runs offline; no API keys needed.
+
+    python bench_prompts.py
+"""
+import json
+import timeit
+from app.services import prompt_registry as prompts
+
+TRIP = {
+    "destination": "Kyoto",
+    "duration_days": 5,
+    "dates": "2026-04-02 to 2026-04-06",
+    "budget": "$3000",
+    "group_size": 2,
+    "pace": "Moderate",
+    "styles": ["Foodie", "History"],
+    "accessibility": None,
+    "dietary_restrictions": "Vegetarian",
+    "intent": "I hate waking up early and love quiet temples.",
+}
+
+JSON_SYSTEM = "You are a helpful assistant that outputs only valid JSON."
+
+# --- Legacy prompts, copied verbatim from the pre-registry ai_routes.py ---
+
+def legacy_chat(message, context):
+    return None, f"""
+    You are an expert AI Travel Companion for TravelMind.
+    Context: The user is interested in {context if context else 'general travel'}.
+    User: {message}
+
+    Provide a helpful, friendly, and expert response. Keep it concise (under 100 words) unless asked for details.
+    """
+
+def legacy_plan(t):
+    system_instruction = """
+    You are the 'TravelMind Intelligence Engine', an advanced AI travel planner.
+    Your goal is to create a hyper-personalized, logistic-optimized travel itinerary.
+
+    CRITICAL OUTPUT RULES:
+    1. Respond ONLY with valid JSON.
+    2. Do NOT act like a chatbot. Do not say "Here is your plan". Just JSON.
+    3. The JSON must match the specific schema provided below.
+
+    OPTIMIZATION CRITERIA:
+    - Logic: Minimizing travel time between spots (clustering).
+    - Pacing: Respect the user's requested pace (Relaxed = max 3 activities/day).
+    - Context: heavily weigh the 'natural_language_prompt' for intent (e.g., if they say "I hate waking up early", start days at 11 AM).
+    - Explainability: Every choice must have an "ai_reasoning" field explaining WHY it fits.
+    """
+    user_context = f"""
+    TRIP DETAILS:
+    - Destination: {t["destination"]}
+    - Duration: {t["duration_days"]} days
+    - Dates: {t["dates"]}
+    - Budget: {t["budget"]}
+    - Group Size: {t["group_size"]} people
+
+    USER PREFERENCES:
+    - Pace: {t["pace"]}
+    - Styles: {", ".join(t["styles"])}
+    - Constraints: {t["accessibility"] or "None"}, {t["dietary_restrictions"] or "None"}
+    - Specific Request (Intent): "{t["intent"]}"
+    """
+    json_schema = """
+    REQUIRED JSON STRUCTURE:
+    {
+      "trip_summary": {
+        "title": "String",
+        "description": "Short overview of the vibe",
+        "sustainability_score": "Integer 1-10",
+        "estimated_total_cost": "String"
+      },
+      "days": [
+        {
+          "day": 1,
+          "date": "String",
+          "theme": "String (e.g., 'Historical Immersion')",
+          "weather_prediction": "String (e.g., 'Sunny, 24°C')",
+          "activities": [
+            {
+              "time": "String (e.g., '10:00 AM')",
+              "title": "String",
+              "type": "transport|hotel|food|activity|break",
+              "description": "String",
+              "location": "String",
+              "cost_estimate": "String",
+              "crowd_prediction": "Low|Moderate|High|Extreme",
+              "ai_reasoning": "String (Why this specific spot? Link to user prefs)",
+              "alternatives": [
+                 { "title": "String", "reason": "String (e.g., 'If rain', 'Cheaper option')" }
+              ]
+            }
+          ]
+        }
+      ]
+    }
+    """
+    return JSON_SYSTEM, f"{system_instruction}\n\n{user_context}\n\n{json_schema}"
+
+def legacy_safety(destination):
+    return JSON_SYSTEM, f"""
+        Provide a live safety intelligence report for {destination}.
+        Include:
+        1. 'score': Safety rating (0-100).
+        2. 'status': Brief status (e.g., 'Very Safe', 'Exercise Caution').
+        3. 'advisories': List of 3 specific current safety tips for tourists.
+        4. 'emergency': Emergency phone number.
+        5. 'risks': List of 3 potential risks (e.g., 'Pickpockets in Metro', 'Sun Exposure').
+
+        Return ONLY valid JSON.
+        """
+
+def legacy_crowd(destination):
+    return JSON_SYSTEM, f"""
+        Provide a real-time crowd intelligence report for {destination}.
+        Include:
+        1. 'hourly_forecast': Array of 7 objects with 'time' (8AM to 8PM) and 'density' (0-100).
+        2. 'major_spots': Array of 3 key attractions in {destination} with 'name', 'status' (Low/Moderate/High), 'density' (0-100), and 'wait_time' (mins).
+        3. 'advice': A specific tip to avoid crowds.
+
+        Return ONLY valid JSON.
+        """
+
+# --- Registry prompts ---
+
+def registry_chat(message, context):
+    return prompts.CHAT.system, prompts.CHAT.render(context=context or "general travel", message=message)
+
+def registry_plan(t):
+    return prompts.PLAN.system, prompts.PLAN.render(
+        destination=t["destination"], duration_days=t["duration_days"], dates=t["dates"],
+        budget=t["budget"], group_size=t["group_size"], pace=t["pace"],
+        styles=", ".join(t["styles"]), accessibility=t["accessibility"] or "None",
+        dietary_restrictions=t["dietary_restrictions"] or "None", intent=t["intent"],
+    )
+
+# The crowd prompt now only asks for advice on a forecast computed locally
+CROWD_VALUES = {
+    "date": "2026-04-04", "weekday": "Saturday", "quiet": "8AM (31%)", "busy": "2PM (88%)",
+    "spots": "Fushimi Inari (92%), Kiyomizu-dera (85%), Arashiyama (81%)", "events": "Cherry blossom season",
+}
+
+def registry_insight(category, **values):
+    def build(destination):
+        template = prompts.INSIGHT_CROWD if category == "crowd" else prompts.insight_template(category)
+        return template.system, template.render(destination=destination, **values)
+    return build
+
+CASES = [
+    ("chat", lambda: legacy_chat("Where should I eat ramen?", "Kyoto"),
+             lambda: registry_chat("Where should I eat ramen?", "Kyoto")),
+    ("plan", lambda: legacy_plan(TRIP), lambda: registry_plan(TRIP)),
+    ("insight/safety", lambda: legacy_safety("Kyoto"), lambda: registry_insight("safety")("Kyoto")),
+    ("insight/crowd", lambda: legacy_crowd("Kyoto"), lambda: registry_insight("crowd", **CROWD_VALUES)("Kyoto")),
+]
+
+# --- Realistic completions, to size the plan output budget ---
+
+SPOTS = [
+    ("11:00 AM", "Kiyomizu-dera Temple", "activity", "1-294 Kiyomizu, Higashiyama Ward, Kyoto", 34.9949, 135.785, "$4 per person"),
+    ("1:00 PM", "Lunch at Shoraian", "food", "Sagakamenoocho, Ukyo Ward, Kyoto", 35.0142, 135.6716, "$30-45 per person"),
+    ("3:00 PM", "Arashiyama Bamboo Grove", "activity", "Sagaogurayama, Ukyo Ward, Kyoto", 35.017, 135.6713, "Free"),
+    ("5:30 PM", "Gion evening walk", "activity", "Gion, Higashiyama Ward, Kyoto", 35.0037, 135.7788, "Free"),
+    ("7:30 PM", "Dinner at Ganko Takasegawa Nijoen", "food", "Kiyamachi-dori Nijo, Nakagyo Ward, Kyoto", 35.0113, 135.7707, "$40-60 per person"),
+    ("9:00 AM", "Fushimi Inari Taisha", "activity", "68 Fukakusa Yabunouchicho, Fushimi Ward, Kyoto", 34.9671, 135.7727, "Free"),
+    ("4:00 PM", "Nishiki Market", "food", "Nakagyo Ward, Kyoto", 35.005, 135.7649, "$15-25 per person"),
+    ("10:00 AM", "Kinkaku-ji", "activity", "1 Kinkakujicho, Kita Ward, Kyoto", 35.0394, 135.7292, "$3 per person"),
+    ("6:00 PM", "Taxi back to the ryokan", "transport", "Higashiyama Ward, Kyoto", 35.0, 135.78, "$12"),
+]
+
+def sample_day(day: int, activities: int) -> dict:
+    return {
+        "day": day, "date": f"2026-04-0{day}", "theme": "Temples and Old Kyoto", "weather_prediction": "Sunny, 18°C",
+        "activities": [{
+            "time": time, "title": title, "type": kind,
+            "description": f"Explore {title}, one of the most atmospheric corners of the city, with time to wander the side streets, take photos and soak in the local atmosphere at an unhurried pace.",
+            "location": location, "lat": lat, "lng": lng, "cost_estimate": cost, "crowd_prediction": "Moderate",
+            "ai_reasoning": f"You asked for quiet temples and late starts, so {title} is scheduled when tour groups have thinned out and it fits your interest in history and local food.",
+            "alternatives": [
+                {"title": "Nanzen-ji Temple", "reason": "If rain: covered halls and a short walk from the subway"},
+                {"title": "Nishiki Market food walk", "reason": "Cheaper option that still covers local specialties"},
+            ],
+        } for time, title, kind, location, lat, lng, cost in SPOTS[:activities]],
+    }
+
+def sample_plan(days: int, activities: int) -> dict:
+    return {
+        "trip_summary": {
+            "title": "Slow Mornings in Kyoto", "sustainability_score": 8, "estimated_total_cost": "$2,400 for two",
+            "description": "Late starts, quiet temples and vegetarian kaiseki, grouped by neighbourhood to keep transit short.",
+        },
+        "days": [sample_day(d + 1, activities) for d in range(days)],
+    }
+
+def completion_tokens(plan: dict) -> tuple:
+    compact = prompts.count_tokens(json.dumps(plan, ensure_ascii=False, separators=(",", ":")))
+    pretty = prompts.count_tokens(json.dumps(plan, ensure_ascii=False, indent=2))
+    return compact, pretty
+
+def measure(build):
+    system, user = build()
+    total = prompts.count_tokens(system or "") + prompts.count_tokens(user)
+    # With a prefix-cache hit only the per-request user message is billed at full rate
+    uncached = prompts.count_tokens(user) if system else total
+    runs = 20000
+    build_us = timeit.timeit(build, number=runs) / runs * 1e6
+    account_us = timeit.timeit(lambda: prompts.count_tokens(user), number=2000) / 2000 * 1e6
+    return total, uncached, build_us, account_us
+
+def main():
+    header = f"{'endpoint':<16}{'tokens old':>11}{'tokens new':>11}{'saved':>8}{'uncached new':>14}{'build old us':>14}{'build new us':>14}{'count us':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, old, new in CASES:
+        old_tokens, _, old_us, _ = measure(old)
+        new_tokens, new_uncached, new_us, count_us = measure(new)
+        saved = 100 * (old_tokens - new_tokens) / old_tokens
+        print(f"{name:<16}{old_tokens:>11}{new_tokens:>11}{saved:>7.1f}%{new_uncached:>14}{old_us:>14.2f}{new_us:>14.2f}{count_us:>10.1f}")
+
+    header = f"{'plan completion':<24}{'compact':>9}{'pretty':>9}{'max_tokens':>12}{'headroom':>10}"
+    print(f"\n{header}\n{'-' * len(header)}")
+    for pace, activities in (("Relaxed", 3), ("Moderate", 5), ("Fast-paced", 8)):
+        for days in (1, 2, 5, 7):
+            compact, pretty = completion_tokens(sample_plan(days, activities))
+            budget = prompts.plan_max_tokens(days, pace)
+            print(f"{f'{pace} {days}d x {activities}':<24}{compact:>9}{pretty:>9}{budget:>12}{budget / pretty:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Measures the per-request overhead of rate limiting (GCRA on the memory and SQLite
+backends, and end to end through the ASGI stack), then shows load shedding when the
+upstream AI queue is saturated. Runs offline against stand-ins.
+
+    python bench_rate_limits.py
+"""
+import asyncio
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from app.api.limits import IPRateLimitMiddleware, rate_limit
+from app.auth.auth_utils import User, get_current_user
+from app.services import ai_service as ai_module
+from app.services import rate_limiter as limiter_module
+from app.services.rate_limiter import MemoryBackend, RateLimit, RateLimiter, SQLiteBackend
+
+GENEROUS = {scope: RateLimit(10_000_000, 60) for scope in ("ip", "bench")}
+
+def backend_us(backend, keys: int, calls: int = 20000) -> float:
+    limiter = RateLimiter(backend, GENEROUS)
+    start = time.perf_counter()
+    for i in range(calls):
+        limiter.check("bench", f"user{i % keys}")
+    return (time.perf_counter() - start) / calls * 1e6
+
+def build_app(limited: bool) -> FastAPI:
+    app = FastAPI()
+    if limited:
+        app.add_middleware(IPRateLimitMiddleware)
+    deps = [Depends(rate_limit("bench"))] if limited else [Depends(get_current_user)]
+
+    @app.get("/api/ping", dependencies=deps)
+    async def ping():
+        return {"ok": True}
+
+    app.dependency_overrides[get_current_user] = lambda: User(email="bench@example.com", full_name="Bench")
+    return app
+
+async def http_us(app: FastAPI, calls: int = 3000) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(200):
+            await client.get("/api/ping")
+        start = time.perf_counter()
+        for _ in range(calls):
+            await client.get("/api/ping")
+        return (time.perf_counter() - start) / calls * 1e6
+
+async def rejection_demo():
+    limiter_module.rate_limiter.limits["bench"] = RateLimit(5, 60)
+    transport = httpx.ASGITransport(app=build_app(True))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        statuses = [(await client.get("/api/ping")) for _ in range(7)]
+    last = statuses[-1]
+    print(f"5/min limit, 7 calls -> {[r.status_code for r in statuses]}, Retry-After: {last.headers.get('retry-after')}")
+
+class SlowCompletions:
+    """Upstream stand-in that takes 200 ms per completion."""
+    async def create(self, messages, model, **kwargs):
+        await asyncio.sleep(0.2)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"ok": true}'))])
+
+async def overload_demo(concurrent: int = 60):
+    ai_module.AI_MAX_INFLIGHT, ai_module.AI_MAX_QUEUED = 4, 8
+    service = ai_module.AIService()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SlowCompletions()))
+    service.model = "stand-in"
+    await service.get_json_content("warm prompt 0")  # one cached answer
+
+    prompts = [f"warm prompt {i % 2}" for i in range(concurrent)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(service.get_json_content(p) for p in prompts))
+    elapsed = time.perf_counter() - start
+    served = sum(1 for r in results if r == '{"ok": true}')
+    print(f"{concurrent} concurrent calls, 4 in flight / 8 queued: {served} answered "
+          f"(upstream or cached), {concurrent - served} degraded, wall {elapsed:.2f}s "
+          f"(unbounded queue would take {concurrent / 4 * 0.2:.1f}s)")
+
+def main():
+    limiter_module.rate_limiter.limits.update(GENEROUS)
+    db = os.path.join(tempfile.mkdtemp(), "rate_limits.db")
+    print(f"{'backend':<22}{'1 key':>10}{'10k keys':>12}   (us per check)")
+    print(f"{'memory':<22}{backend_us(MemoryBackend(), 1):>10.2f}{backend_us(MemoryBackend(), 10000):>12.2f}")
+    print(f"{'sqlite (WAL)':<22}{backend_us(SQLiteBackend(db), 1, 5000):>10.2f}{backend_us(SQLiteBackend(db), 10000, 5000):>12.2f}")
+
+    plain = asyncio.run(http_us(build_app(False)))
+    limiter_module.rate_limiter.backend = MemoryBackend()
+    memory = asyncio.run(http_us(build_app(True)))
+    limiter_module.rate_limiter.backend = SQLiteBackend(db)
+    sqlite = asyncio.run(http_us(build_app(True)))
+    print(f"\nend to end (ASGI, auth stubbed): no limits {plain:.0f} us, memory {memory:.0f} us "
+          f"(+{memory - plain:.0f}), sqlite {sqlite:.0f} us (+{sqlite - plain:.0f})")
+
+    limiter_module.rate_limiter.backend = MemoryBackend()
+    asyncio.run(rejection_demo())
+    asyncio.run(overload_demo())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Times the local route optimizer on synthetic trips and reports travel distance
+before and after reordering. Runs offline.
+
+    python bench_routes.py
+"""
+import copy
+import random
+import time
+from app.services.gazetteer import gazetteer
+from app.services.route_optimizer import route_optimizer
+
+def synthetic_trip(days: int, activities: int, seed: int = 7) -> dict:
+    """Kyoto trip with random spots, a hotel each morning and lunch/dinner slots."""
+    rng = random.Random(seed)
+    city = next(p for p in gazetteer.places if p["id"] == "kyoto")
+    per_day = [activities // days + (1 if d < activities % days else 0) for d in range(days)]
+    trip = {"days": []}
+    for d, count in enumerate(per_day):
+        items = []
+        for i in range(count):
+            if i == 0:
+                kind = "hotel"
+            elif i in (count // 2, count - 1):
+                kind = "food"
+            else:
+                kind = "activity"
+            items.append({
+                "time": f"{8 + i}:00",
+                "title": f"Stop {d + 1}.{i + 1}",
+                "type": kind,
+                "lat": city["lat"] + rng.uniform(-0.08, 0.08),
+                "lng": city["lng"] + rng.uniform(-0.1, 0.1),
+            })
+        trip["days"].append({"day": d + 1, "activities": items})
+    return trip
+
+def gazetteer_trip() -> dict:
+    """A small itinerary that relies only on place names, as the model usually returns it."""
+    names = [
+        ("Kyoto Station", "hotel"), ("Kinkaku-ji", "activity"), ("Fushimi Inari Shrine", "activity"),
+        ("Nishiki Market", "food"), ("Arashiyama Bamboo Grove", "activity"), ("Gion", "activity"),
+        ("Ryoan-ji", "activity"), ("Pontocho", "food"),
+        ("Kyoto Station", "hotel"), ("Ginkaku-ji", "activity"), ("Tenryu-ji", "activity"),
+        ("Philosopher's Path", "activity"), ("Nishiki Market", "food"), ("Nijo Castle", "activity"),
+        ("Kiyomizu-dera", "activity"), ("Gion", "food"),
+    ]
+    days = [names[:8], names[8:]]
+    return {"days": [
+        {"day": d + 1, "activities": [{"time": f"{9 + i}:00", "title": n, "location": f"{n}, Kyoto", "type": t}
+                                      for i, (n, t) in enumerate(day)]}
+        for d, day in enumerate(days)
+    ]}
+
+def run(label: str, trip: dict, destination: str, repeats: int):
+    timings = []
+    for _ in range(repeats):
+        working = copy.deepcopy(trip)
+        start = time.perf_counter()
+        summary = route_optimizer.optimize(working, destination)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    saved = summary["distance_km_before"] - summary["distance_km_after"]
+    pct = 100 * saved / summary["distance_km_before"] if summary["distance_km_before"] else 0.0
+    print(f"{label:<28}{summary['located']:>4}/{summary['activities']:<4}"
+          f"{summary['distance_km_before']:>10.1f}{summary['distance_km_after']:>10.1f}{pct:>8.1f}%"
+          f"{timings[len(timings) // 2]:>10.2f}{timings[-1]:>10.2f}")
+
+def main():
+    gazetteer.places  # load outside the timed region
+    print(f"{'trip':<28}{'located':>9}{'km before':>10}{'km after':>10}{'saved':>9}{'p50 ms':>10}{'max ms':>10}")
+    run("gazetteer names, 2d/16", gazetteer_trip(), "Kyoto, Japan", 50)
+    for days, count in ((3, 20), (7, 50), (14, 100), (21, 150)):
+        run(f"synthetic {days}d/{count}", synthetic_trip(days, count), "Kyoto", 20)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Throughput and cache hit rate from 1 to 8 workers, per-worker memory cache vs the shared
+SQLite cache.
+
+Each run starts serve.py with N workers against a local stand-in for Groq (300 ms per
+completion) and Supabase auth, then replays the same insight workload: 1500 requests, 32 in
+flight, Zipf-distributed over 24 destination/category pairs written with spelling variants.
+Hit rate is 1 - upstream completions / requests.
+
+    python bench_workers.py [--workers 1 2 4 8]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+UPSTREAM_DELAY = 0.3
+REQUESTS = 1500
+CONCURRENCY = 32
+
+DESTINATIONS = {
+    "kyoto": ["Kyoto", "kyoto", "Kyoto, Japan"],
+    "paris": ["Paris", "paris", "Paris, France"],
+    "rome": ["Rome", "Roma", "rome"],
+    "barcelona": ["Barcelona", "barcelona, spain"],
+    "new-york": ["New York", "new york city"],
+    "bali": ["Bali", "bali, indonesia"],
+}
+CATEGORIES = ["safety", "budget", "sustainability", "reviews"]
+
+USER = {
+    "id": "00000000-0000-0000-0000-000000000001", "aud": "authenticated", "role": "authenticated",
+    "email": "bench@example.com", "app_metadata": {}, "user_metadata": {"full_name": "Bench"},
+    "created_at": "2026-01-01T00:00:00Z",
+}
+
+stand_in = FastAPI()
+completions = 0
+
+@stand_in.post("/openai/v1/chat/completions")
+async def chat_completions():
+    global completions
+    completions += 1
+    await asyncio.sleep(UPSTREAM_DELAY)
+    content = json.dumps({"score": 82, "status": "Very Safe", "advisories": ["Watch for cyclists"]})
+    return {"id": "bench", "object": "chat.completion", "created": int(time.time()), "model": "stand-in",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 40, "total_tokens": 140}}
+
+@stand_in.get("/openai/v1/models")
+async def models():
+    return {"object": "list", "data": []}
+
+@stand_in.get("/auth/v1/user")
+async def user():
+    return USER
+
+@stand_in.get("/auth/v1/health")
+async def health():
+    return {"name": "GoTrue"}
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_stand_in(port: int):
+    server = uvicorn.Server(uvicorn.Config(stand_in, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+
+def workload(seed: int = 5) -> list:
+    rng = random.Random(seed)
+    pairs = [(d, c) for d in DESTINATIONS for c in CATEGORIES]
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(len(pairs))]
+    requests = []
+    for destination, category in rng.choices(pairs, weights, k=REQUESTS):
+        requests.append({"destination": rng.choice(DESTINATIONS[destination]), "category": category})
+    return requests
+
+def launch(workers: int, port: int, upstream: str, cache: str, db: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "GROQ_API_KEY": "bench", "GROQ_BASE_URL": upstream,
+        "SUPABASE_URL": upstream, "SUPABASE_ANON_KEY": "bench.anon.key",
+        "CACHE_BACKEND": cache, "CACHE_DB": db, "RATE_LIMIT_BACKEND": "off",
+        "AI_MAX_INFLIGHT": "64", "AI_MAX_QUEUED": "1000", "PYTHONUNBUFFERED": "1",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    warmed = 0
+    deadline = time.time() + 60
+    while warmed < workers and time.time() < deadline:
+        line = process.stdout.readline()
+        if not line:
+            break
+        warmed += line.count("warmed up")  # lines from two workers can interleave
+    if warmed < workers:
+        process.kill()
+        raise RuntimeError(f"only {warmed} of {workers} workers started")
+    # Keep draining output so workers never block on a full pipe
+    threading.Thread(target=lambda: [None for _ in process.stdout], daemon=True).start()
+    return process
+
+async def replay(port: int, requests: list) -> list:
+    limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        queue = asyncio.Queue()
+        for body in requests:
+            queue.put_nowait(body)
+        timings = []
+
+        async def client_loop():
+            while not queue.empty():
+                body = queue.get_nowait()
+                start = time.perf_counter()
+                r = await client.post("/api/ai/insight", json=body, headers={"Authorization": "Bearer token"})
+                timings.append(time.perf_counter() - start)
+                assert r.status_code == 200 and "error" not in r.json()["insight"], r.text
+
+        await asyncio.gather(*(client_loop() for _ in range(CONCURRENCY)))
+    return sorted(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    global completions
+    upstream_port = free_port()
+    start_stand_in(upstream_port)
+    upstream = f"http://127.0.0.1:{upstream_port}"
+    requests = workload()
+    distinct = len({(r["category"], r["destination"]) for r in requests})
+    print(f"{REQUESTS} insight requests, {CONCURRENCY} in flight, {distinct} distinct request bodies, "
+          f"upstream {int(UPSTREAM_DELAY * 1000)} ms; {os.cpu_count()} CPU(s) available")
+    print(f"{'workers':>7}  {'cache':<7}{'req/s':>8}{'p50 ms':>9}{'p99 ms':>9}{'upstream':>10}{'hit rate':>10}")
+    for workers in args.workers:
+        for cache in ("memory", "sqlite"):
+            with tempfile.TemporaryDirectory() as tmp:
+                port = free_port()
+                process = launch(workers, port, upstream, cache, os.path.join(tmp, "cache.db"))
+                try:
+                    completions = 0
+                    start = time.perf_counter()
+                    timings = asyncio.run(replay(port, requests))
+                    elapsed = time.perf_counter() - start
+                finally:
+                    process.terminate()
+                    process.wait(timeout=30)
+            print(f"{workers:>7}  {cache:<7}{len(timings) / elapsed:>8.0f}{1000 * timings[len(timings) // 2]:>9.1f}"
+                  f"{1000 * timings[int(len(timings) * 0.99)]:>9.1f}{completions:>10}{1 - completions / REQUESTS:>10.1%}")
+
+if __name__ == "__main__":
+    main()
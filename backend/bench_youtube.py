@@ -0,0 +1,98 @@
+"""
+YouTube quota per rendered video, before and after enrichment + caching, against a local
+stand-in for the Data API that charges search.list 100 units and videos.list 1 unit.
+
+    python bench_youtube.py
+"""
+import hashlib
+import random
+from types import SimpleNamespace
+from app.services.youtube_service import YouTubeService, SEARCH_COST
+from app.services.shared_cache import MemoryBackend, ResponseCache
+
+class _Call:
+    def __init__(self, fn):
+        self.execute = fn
+
+class StandInYouTube:
+    """Each destination has a pool of popular videos that different queries keep returning."""
+    def __init__(self):
+        self.quota = 0
+        self.calls = {"search": 0, "videos": 0}
+
+    def _pool(self, query: str) -> list:
+        destination = query.split()[0].lower()
+        return [f"{destination}-{i:03d}" for i in range(200)]
+
+    def search(self):
+        def list_(q, maxResults, pageToken=None, **params):
+            def execute():
+                self.quota += 100
+                self.calls["search"] += 1
+                offset = int(pageToken or 0)
+                # Queries about the same place overlap heavily
+                seed = int(hashlib.md5(q.encode()).hexdigest(), 16) % 20
+                pool = self._pool(q)
+                ids = pool[seed + offset: seed + offset + maxResults]
+                items = [{"id": {"videoId": i}, "snippet": {
+                    "title": i, "description": "", "thumbnails": {"high": {"url": f"https://img/{i}.jpg"}},
+                    "channelTitle": "stand-in", "publishTime": "2026-01-01T00:00:00Z"}} for i in ids]
+                return {"items": items, "nextPageToken": str(offset + maxResults)}
+            return _Call(execute)
+        return SimpleNamespace(list=list_)
+
+    def videos(self):
+        def list_(part, id, maxResults):
+            def execute():
+                self.quota += 1
+                self.calls["videos"] += 1
+                return {"items": [{"id": i, "contentDetails": {"duration": "PT12M30S"},
+                                   "statistics": {"viewCount": "1000", "likeCount": "50"}} for i in id.split(",")]}
+            return _Call(execute)
+        return SimpleNamespace(list=list_)
+
+DESTINATIONS = ["Kyoto", "Paris", "Rome", "Tokyo", "Barcelona"]
+SUFFIXES = ["travel guide 4k", "walking tour", "travel guide 4k", "food tour"]
+
+def workload(seed: int = 3, sessions: int = 300):
+    """Each session opens VirtualTour for a destination; a third of them load one more page."""
+    rng = random.Random(seed)
+    for _ in range(sessions):
+        query = f"{rng.choice(DESTINATIONS)} {rng.choice(SUFFIXES)}"
+        yield query, 2 if rng.random() < 0.33 else 1
+
+def legacy(api: StandInYouTube) -> int:
+    """Previous behaviour: one uncached 6-result search per page view, snippet only."""
+    rendered = 0
+    for query, pages in workload():
+        for page in range(pages):
+            api.search().list(q=query, maxResults=6, pageToken=str(page * 6) if page else None).execute()
+            rendered += 6
+    return rendered
+
+def enriched(api: StandInYouTube, page_size: int) -> int:
+    service = YouTubeService(youtube=api, cache=ResponseCache(MemoryBackend()))
+    rendered = 0
+    for query, pages in workload():
+        token = None
+        for _ in range(pages):
+            page = service.search_page(query, page_size, token)
+            token = page["next_page_token"]
+            rendered += len(page["videos"])
+    assert service.quota_used == api.quota
+    return rendered
+
+def main():
+    print(f"{'mode':<34}{'search':>8}{'videos':>8}{'quota':>8}{'rendered':>10}{'units/video':>13}")
+    api = StandInYouTube()
+    rendered = legacy(api)
+    print(f"{'before: snippet only, no cache':<34}{api.calls['search']:>8}{api.calls['videos']:>8}{api.quota:>8}{rendered:>10}{api.quota / rendered:>13.2f}")
+    for size in (6, 12, 24):
+        api = StandInYouTube()
+        rendered = enriched(api, size)
+        label = f"after: enriched + cached, page {size}"
+        print(f"{label:<34}{api.calls['search']:>8}{api.calls['videos']:>8}{api.quota:>8}{rendered:>10}{api.quota / rendered:>13.2f}")
+    print(f"\n(search.list = {SEARCH_COST} units; videos.list = 1 unit per call of up to 50 ids)")
+
+if __name__ == "__main__":
+    main()
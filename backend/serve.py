@@ -0,0 +1,43 @@
+"""
+Multi-worker launcher. Sizes uvicorn workers to the cores this process may use and switches
+the rate limiter and result cache to their SQLite backends so all workers share them.
+
+    python serve.py                 # one worker per core
+    python serve.py --workers 4 --port 8000
+
+WEB_CONCURRENCY overrides the worker count; explicit CACHE_BACKEND / RATE_LIMIT_BACKEND
+settings are left alone.
+"""
+import argparse
+import os
+import uvicorn
+
+MAX_WORKERS = 16
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def default_workers() -> int:
+    # Handlers are async and mostly wait on upstream APIs, so one worker per core is enough
+    return max(1, min(int(os.getenv("WEB_CONCURRENCY") or available_cores()), MAX_WORKERS))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the TravelMind API with several workers.")
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # Workers are separate processes; per-process state would split limits and caches N ways
+        os.environ.setdefault("CACHE_BACKEND", "sqlite")
+        os.environ.setdefault("RATE_LIMIT_BACKEND", "sqlite")
+    print(f"Starting {args.workers} worker(s) on {args.host}:{args.port} "
+          f"(cache: {os.getenv('CACHE_BACKEND', 'memory')}, rate limits: {os.getenv('RATE_LIMIT_BACKEND', 'memory')})")
+    uvicorn.run("app.main:app", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+
+if __name__ == "__main__":
+    main()
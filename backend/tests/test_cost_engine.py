@@ -0,0 +1,52 @@
+import pytest
+from app.services.cost_engine import cost_engine, parse_cost
+
+@pytest.mark.parametrize("value, expected", [
+    ("$20", (20.0, 20.0, "USD")),
+    ("Free", (0.0, 0.0, None)),
+    ("Included in ticket", (0.0, 0.0, None)),
+    ("€15-25", (15.0, 25.0, "EUR")),
+    ("Free - $10", (0.0, 10.0, "USD")),
+    ("2000 JPY", (2000.0, 2000.0, "JPY")),
+    ("₹1.2k", (1200.0, 1200.0, "INR")),
+    ("Day pass 24hr $15", (15.0, 15.0, "USD")),
+    ("500 rupees", (500.0, 500.0, "INR")),
+    ("Rs. 300 to 500", (300.0, 500.0, "INR")),
+])
+def test_parse_cost_formats(value, expected):
+    assert parse_cost(value) == expected
+
+@pytest.mark.parametrize("value, expected", [
+    (20, (20.0, 20.0, None)),
+    (12.5, (12.5, 12.5, None)),
+    (0, (0.0, 0.0, None)),
+])
+def test_parse_cost_bare_numbers(value, expected):
+    assert parse_cost(value) == expected
+
+@pytest.mark.parametrize("value, expected", [
+    ("1,200", 1200.0),
+    ("1.200", 1200.0),
+    ("₹1,20,000", 120000.0),
+    ("1,234.50", 1234.5),
+    ("1.234,50", 1234.5),
+    ("12.50", 12.5),
+    ("€12,50", 12.5),
+    ("€3,5", 3.5),
+])
+def test_parse_cost_separators(value, expected):
+    assert parse_cost(value)[0] == expected
+
+@pytest.mark.parametrize("value", [None, "", "  ", "Varies", -5, True, False, [20], {"amount": 20}])
+def test_parse_cost_rejects_values_without_an_amount(value):
+    assert parse_cost(value) is None
+
+def test_breakdown_converts_to_the_trip_currency():
+    itinerary = {"days": [{"day": 1, "activities": [
+        {"type": "food", "cost_estimate": "€12,50"},
+        {"type": "activity", "cost_estimate": "Free"},
+        {"type": "hotel", "cost_estimate": ["not", "a", "cost"]},
+    ]}]}
+    summary = cost_engine.breakdown(itinerary, "EUR")
+    assert summary["currency"] == "EUR"
+    assert summary["unparsed"] == 1
@@ -0,0 +1,92 @@
+import copy
+import pytest
+from app.services.gazetteer import gazetteer
+from app.services.route_optimizer import route_optimizer
+
+def coords_of(place_id):
+    place = gazetteer.get(place_id)
+    return place["lat"], place["lng"]
+
+def item(title, kind="activity", **extra):
+    return {"time": "09:00", "title": title, "type": kind, **extra}
+
+@pytest.mark.parametrize("text, city_id, expected", [
+    ("Fushimi Inari Shrine", None, "kyoto/fushimi-inari-shrine"),
+    ("Fushimi Inari Shrine, Kyoto", None, "kyoto/fushimi-inari-shrine"),
+    ("Sunrise walk at Fushimi Inari", "kyoto", "kyoto/fushimi-inari-shrine"),
+    ("Sagrada Família", "barcelona", "barcelona/sagrada-família"),
+    ("LA", None, "los-angeles"),
+])
+def test_geocode_finds_known_places(text, city_id, expected):
+    assert gazetteer.geocode(text, city_id) == coords_of(expected)
+
+@pytest.mark.parametrize("text, city_id", [
+    # Short aliases ("la", "sf") and cities abroad must not match inside other names
+    ("Placa de la Vila de Gracia", "barcelona"),
+    ("Museo de la Ciudad", "barcelona"),
+    ("Nice sunset dinner spot", "tokyo"),
+    ("Nice sunset dinner spot", None),
+    ("LA", "barcelona"),
+    ("Nice", "tokyo"),
+    ("Senso-ji", "kyoto"),
+    ("", None),
+])
+def test_geocode_rejects_places_outside_the_city(text, city_id):
+    assert gazetteer.geocode(text, city_id) is None
+
+def test_locate_drops_model_coordinates_far_from_the_city():
+    lat, lng = coords_of("paris")
+    assert route_optimizer.locate({"lat": lat, "lng": lng}, "barcelona") is None
+    assert route_optimizer.locate({"lat": lat, "lng": lng}) == (lat, lng)
+
+def barcelona_trip():
+    return {"days": [
+        {"day": 1, "activities": [
+            item("Hotel check-in", "hotel", location="La Rambla"),
+            item("Placa de la Vila de Gracia"),
+            item("Sagrada Familia"),
+            item("Montjuic"),
+            item("Casa Batllo"),
+            item("Dinner", "food", location="La Boqueria"),
+        ]},
+        {"day": 2, "activities": [
+            item("Park Guell"),
+            item("Museo de la Ciudad"),
+            item("Barceloneta Beach"),
+            item("Gothic Quarter"),
+            item("Airport transfer", "transport", location="Barcelona"),
+        ]},
+    ]}
+
+def test_optimize_keeps_distances_inside_the_city():
+    trip = barcelona_trip()
+    summary = route_optimizer.optimize(trip, "Barcelona")
+    assert summary["activities"] == 11
+    assert summary["located"] == 9
+    assert summary["distance_km_before"] < 50
+    assert summary["distance_km_after"] <= summary["distance_km_before"]
+
+def test_optimize_keeps_fixed_items_and_day_boundaries():
+    trip = barcelona_trip()
+    original = copy.deepcopy(trip)
+    route_optimizer.optimize(trip, "Barcelona")
+    for before, after in zip(original["days"], trip["days"]):
+        # Unlocated and fixed items (hotel, meals, transport) keep their slot
+        for i, activity in enumerate(before["activities"]):
+            if activity["type"] != "activity" or activity["title"] in ("Placa de la Vila de Gracia", "Museo de la Ciudad"):
+                assert after["activities"][i]["title"] == activity["title"]
+        # Times belong to the slot
+        assert [a["time"] for a in after["activities"]] == [a["time"] for a in before["activities"]]
+        # A day's opening and closing activities stay in that day
+        titles = {a["title"] for a in after["activities"]}
+        assert before["activities"][0]["title"] in titles
+        assert before["activities"][-1]["title"] in titles
+    assert sorted(a["title"] for d in trip["days"] for a in d["activities"]) == \
+        sorted(a["title"] for d in original["days"] for a in d["activities"])
+
+def test_optimize_without_enough_located_points_is_a_no_op():
+    trip = {"days": [{"day": 1, "activities": [item("Somewhere unknown"), item("Sagrada Familia")]}]}
+    original = copy.deepcopy(trip)
+    summary = route_optimizer.optimize(trip, "Barcelona")
+    assert summary == {"activities": 2, "located": 1, "distance_km_before": 0.0, "distance_km_after": 0.0}
+    assert trip == original
@@ -18,6 +18,9 @@ export const config = {
         media: {
             videos: `${API_URL}/api/media/videos`,
         },
+        destinations: {
+            suggest: `${API_URL}/api/destinations/suggest`,
+        },
     },
 };
 
@@ -55,8 +55,22 @@ export default function Budget() {
         );
     }
 
-    // Dynamic Logic based on active trip data
-    const currency = activeTrip.budget?.currency || '₹';
+    // Server-side totals from the planner, parsed and currency-normalized
+    const costBreakdown = activeTrip.itinerary?.cost_breakdown;
+
+    // Symbol for an ISO code ("USD" -> "$"), or the code itself if the browser has none
+    const currencySymbol = (code) => {
+        try {
+            return new Intl.NumberFormat('en', { style: 'currency', currency: code })
+                .formatToParts(0).find(part => part.type === 'currency').value;
+        } catch (e) {
+            return `${code} `;
+        }
+    };
+
+    // Dynamic Logic based on active trip data. The breakdown is in the currency the budget
+    // was written in, which is also the unit of budget.total.
+    const currency = costBreakdown?.currency ? currencySymbol(costBreakdown.currency) : (activeTrip.budget?.currency || '₹');
     const totalBudget = Number(activeTrip.budget?.total) || (Number(activeTrip.duration_days) * 5000) || 5000;
 
     // Helper to parse cost estimates (e.g. "₹500" -> 500, "Free" -> 0, "$20" -> 1600 approx)
@@ -80,7 +94,21 @@ export default function Budget() {
 
     const dailyBreakdown = [];
 
-    if (activeTrip.itinerary?.days) {
+    if (costBreakdown) {
+        itineraryCosts = {
+            food: costBreakdown.by_type.food.mid,
+            activities: costBreakdown.by_type.activity.mid,
+            hotels: costBreakdown.by_type.hotel.mid,
+            transit: costBreakdown.by_type.transport.mid,
+            other: 0
+        };
+        costBreakdown.by_day.forEach((day, idx) => {
+            dailyBreakdown.push({
+                day: `Day ${day.day || idx + 1}`,
+                amount: day.mid
+            });
+        });
+    } else if (activeTrip.itinerary?.days) {
         activeTrip.itinerary.days.forEach((day, idx) => {
             let dayTotal = 0;
             day.activities?.forEach(act => {
@@ -108,11 +136,13 @@ export default function Budget() {
     itineraryCosts.other = (totalBudget - (itineraryCosts.food + itineraryCosts.hotels + itineraryCosts.transit + itineraryCosts.activities));
     if (itineraryCosts.other < 0) itineraryCosts.other = totalBudget * 0.05;
 
+    const split = costBreakdown?.parsed ? costBreakdown.split : aiInsight?.suggested_split;
+
     const CATEGORY_DATA = [
-        { name: 'Accommodation', value: Number(aiInsight?.suggested_split?.Accommodation ? (totalBudget * aiInsight.suggested_split.Accommodation / 100) : itineraryCosts.hotels) || 0, color: '#6366f1' },
-        { name: 'Food & Dining', value: Number(aiInsight?.suggested_split?.Food ? (totalBudget * aiInsight.suggested_split.Food / 100) : itineraryCosts.food) || 0, color: '#10b981' },
-        { name: 'Transport', value: Number(aiInsight?.suggested_split?.Transport ? (totalBudget * aiInsight.suggested_split.Transport / 100) : itineraryCosts.transit) || 0, color: '#0ea5e9' },
-        { name: 'Activities', value: Number(aiInsight?.suggested_split?.Activities ? (totalBudget * aiInsight.suggested_split.Activities / 100) : itineraryCosts.activities) || 0, color: '#f59e0b' },
+        { name: 'Accommodation', value: Number(split?.Accommodation ? (totalBudget * split.Accommodation / 100) : itineraryCosts.hotels) || 0, color: '#6366f1' },
+        { name: 'Food & Dining', value: Number(split?.Food ? (totalBudget * split.Food / 100) : itineraryCosts.food) || 0, color: '#10b981' },
+        { name: 'Transport', value: Number(split?.Transport ? (totalBudget * split.Transport / 100) : itineraryCosts.transit) || 0, color: '#0ea5e9' },
+        { name: 'Activities', value: Number(split?.Activities ? (totalBudget * split.Activities / 100) : itineraryCosts.activities) || 0, color: '#f59e0b' },
         { name: 'Misc', value: Number(itineraryCosts.other) || 0, color: '#64748b' },
     ];
 
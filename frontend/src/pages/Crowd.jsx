@@ -72,6 +72,7 @@ export default function Crowd() {
     }
 
     const { hourly_forecast = [], major_spots = [], advice = "" } = insight || {};
+    const chartData = major_spots.find(spot => spot.name === selectedAttraction)?.hourly_forecast || hourly_forecast;
 
     return (
         <div className="crowd-page fade-in max-w-6xl mx-auto p-4 md:p-8">
@@ -114,7 +115,7 @@ export default function Crowd() {
 
                         <div style={{ height: 350 }}>
                             <ResponsiveContainer width="100%" height="100%">
-                                <BarChart data={hourly_forecast}>
+                                <BarChart data={chartData}>
                                     <CartesianGrid strokeDasharray="3 3" vertical={false} stroke="#f1f5f9" />
                                     <XAxis dataKey="time" axisLine={false} tickLine={false} tick={{ fill: '#94a3b8', fontSize: 11, fontWeight: 'bold' }} dy={10} />
                                     <YAxis axisLine={false} tickLine={false} tick={{ fill: '#94a3b8', fontSize: 11 }} />
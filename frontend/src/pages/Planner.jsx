@@ -34,6 +34,32 @@ export default function Planner() {
 
     // If viewing an active trip, use its itinerary. If none, null.
     const [itinerary, setItinerary] = useState(activeTrip ? activeTrip.itinerary : null);
+    const [suggestions, setSuggestions] = useState([]);
+
+    // Destination autocomplete from the backend gazetteer
+    useEffect(() => {
+        const query = formData.destination.trim();
+        if (query.length < 2) {
+            setSuggestions([]);
+            return;
+        }
+        const controller = new AbortController();
+        const timer = setTimeout(async () => {
+            try {
+                const response = await fetch(`${config.endpoints.destinations.suggest}?q=${encodeURIComponent(query)}`, {
+                    signal: controller.signal
+                });
+                const data = await response.json();
+                setSuggestions(data.suggestions || []);
+            } catch (e) {
+                if (e.name !== 'AbortError') console.error("Destination suggest failed:", e);
+            }
+        }, 150);
+        return () => {
+            clearTimeout(timer);
+            controller.abort();
+        };
+    }, [formData.destination]);
 
     // Sync state when active trip changes externally (e.g. from sidebar)
     useEffect(() => {
@@ -230,9 +256,15 @@ export default function Planner() {
                                     type="text"
                                     placeholder="e.g. Tokyo, Paris, New York"
                                     className="pl-12"
+                                    list="destination-suggestions"
                                     value={formData.destination}
                                     onChange={e => setFormData({ ...formData, destination: e.target.value })}
                                 />
+                                <datalist id="destination-suggestions">
+                                    {suggestions.map(s => (
+                                        <option key={s.id} value={s.kind === 'city' ? s.label : s.name} />
+                                    ))}
+                                </datalist>
                             </div>
                         </div>
                         <div className="grid grid-cols-2 gap-4">